@@ -1,23 +1,36 @@
 import asyncio
 import json
 import logging
+import logging.handlers
 import os
 import platform
+import queue
 import sys
 
-import aiosqlite
 import discord
 from discord.ext import commands, tasks
 from discord.ext.commands import Bot, Context
 
 import exceptions
+from helpers import db_manager
+from helpers.admission import AdmissionController
+from helpers.bracket_cache import BracketCache
+from helpers.bracket_renderer import BracketRenderer, BracketRenderQueue
+from helpers.browser_pool import BrowserPool
+from helpers.challonge_client import ChallongeClient
+from helpers.challonge_mirror import ChallongeMirror
+from helpers.config import ConfigService
+from helpers.tournament_catalog import TournamentCatalog
+from helpers.tournament_pool import TournamentPool
 
 # Checks to find 'config.json' file with settings for bot.  Loads if found, exits with error if not.
-if not os.path.isfile(f"{os.path.realpath(os.path.dirname(__file__))}/config.json"):
+config = ConfigService()
+try:
+    config.load()
+except OSError:
     sys.exit("'config.json' not found! Please add it and try again.")
-else:
-    with open(f"{os.path.realpath(os.path.dirname(__file__))}/config.json") as file:
-        config = json.load(file)
+except ValueError as e:
+    sys.exit(f"'config.json' is invalid: {e}")
 
 # sets intents for bot
 intents = discord.Intents.all()
@@ -27,7 +40,7 @@ intents.members = True
 # sets bot command prefix and loads intents for bot
 # noinspection PyTypeChecker
 bot = Bot(
-    command_prefix=commands.when_mentioned_or(config["prefix"]),
+    command_prefix=lambda bot, message: commands.when_mentioned_or(bot.config.prefix)(bot, message),
     intents=intents,
     help_command=None,
 )
@@ -54,15 +67,37 @@ class LoggingFormatter(logging.Formatter):
         logging.CRITICAL: red + bold,
     }
 
-    def format(self, record):
-        log_color = self.COLORS[record.levelno]
+    def __init__(self):
+        super().__init__()
+        # One formatter per level, built once instead of for every record
+        self.formatters = {level: self._formatter(color) for level, color in self.COLORS.items()}
+        self.default_formatter = self._formatter(self.reset)
+
+    def _formatter(self, log_color: str) -> logging.Formatter:
         format = "(gray){asctime}(reset) (levelcolor){levelname:<8}(reset) (green){name}(reset) {message}"
         format = format.replace("(gray)", self.gray + self.bold)
         format = format.replace("(reset)", self.reset)
         format = format.replace("(levelcolor)", log_color)
         format = format.replace("(green)", self.green + self.bold)
-        formatter = logging.Formatter(format, "%Y-%m-%d %H:%M:%S", style="{")
-        return formatter.format(record)
+        return logging.Formatter(format, "%Y-%m-%d %H:%M:%S", style="{")
+
+    def format(self, record):
+        return self.formatters.get(record.levelno, self.default_formatter).format(record)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats each record as one JSON object per line, for log shippers and jq.
+    """
+
+    def format(self, record):
+        document = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        return json.dumps(document, ensure_ascii=False)
 
 
 logger = logging.getLogger("discord_bot")
@@ -77,45 +112,152 @@ file_handler_formatter = logging.Formatter(
     "[{asctime}] [{levelname:<8}] {name}: {message}", "%Y-%m-%d %H:%M:%S", style="{"
 )
 file_handler.setFormatter(file_handler_formatter)
+log_handlers = [console_handler, file_handler]
+
+# Optional JSON lines file handler, rotated by size. Enabled by setting "log_json_file" in the config.
+if config.log_json_file:
+    json_handler = logging.handlers.RotatingFileHandler(
+        filename=config.log_json_file,
+        maxBytes=config.log_json_max_bytes,
+        backupCount=config.log_json_backup_count,
+        encoding="utf-8",
+    )
+    json_handler.setFormatter(JsonLinesFormatter())
+    log_handlers.append(json_handler)
+
+# The loggers only put records on a queue, a background thread formats them and writes them to the console and the
+# files, so logging never blocks the event loop.
+log_queue = queue.SimpleQueue()
+queue_handler = logging.handlers.QueueHandler(log_queue)
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
 
 # Add the handlers
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+logger.addHandler(queue_handler)
 bot.logger = logger
 
 logger_discord_client = logging.getLogger("discord.client")
 logger_discord_client.setLevel(logging.INFO)
-logger_discord_client.addHandler(console_handler)
-logger_discord_client.addHandler(file_handler)
+logger_discord_client.addHandler(queue_handler)
 logger_discord_client.propagate = False  # avoid duplicate logs
 
 logger_discord_gateway = logging.getLogger("discord.gateway")
 logger_discord_gateway.setLevel(logging.INFO)
-logger_discord_gateway.addHandler(console_handler)
-logger_discord_gateway.addHandler(file_handler)
+logger_discord_gateway.addHandler(queue_handler)
 logger_discord_gateway.propagate = False  # avoid duplicate logs
 
 
 async def init_db():
-    async with aiosqlite.connect(
-            f"{os.path.realpath(os.path.dirname(__file__))}/database/database.db"
-    ) as db:
-        with open(
-                f"{os.path.realpath(os.path.dirname(__file__))}/database/schema.sql"
-        ) as file:
-            await db.executescript(file.read())
-        await db.commit()
+    """
+    Opens the shared database connections, applies the schema and then any pending migration.
+    """
+    await db_manager.database.open()
+    with open(
+            f"{os.path.realpath(os.path.dirname(__file__))}/database/schema.sql"
+    ) as file:
+        await db_manager.database.executescript(file.read())
+    version = await db_manager.database.migrate(
+        f"{os.path.realpath(os.path.dirname(__file__))}/database/migrations"
+    )
+    bot.logger.info(f"Database schema version: {version}")
 
 
 """
-Create a bot variable to access the config file in cogs so that you don't need to import it every time.
+Create a bot variable to access the config file in cogs so that you don't need to import it every time. The config is
+parsed once and reloaded in the background when config.json changes, so reading it never touches the disk.
 
 The config is available using the following code:
-- bot.config # In this file
+- bot.config # In this file, e.g. bot.config.owners
 - self.bot.config # In cogs
 """
+config.logger = logger
 bot.config = config
 
+"""
+Create a single asynchronous Challonge client shared by all cogs, so every command reuses the same pooled HTTP session.
+
+The client is available using the following code:
+- bot.challonge # In this file
+- self.bot.challonge # In cogs
+"""
+bot.challonge = ChallongeClient(config.CHALLONGE_USER, config.CHALLONGE_KEY)
+
+"""
+Create a shared tournament catalog so that cogs can look tournaments up by name without listing them from Challonge.
+
+The catalog is available using the following code:
+- bot.catalog # In this file
+- self.bot.catalog # In cogs
+"""
+bot.catalog = TournamentCatalog(bot.challonge)
+
+"""
+Create the local mirror of Challonge tournaments, participants and matches. It polls the account and the communities
+listed under "challonge_subdomains" in the config (null for the account itself) in the background, so read commands
+are served from the database instead of waiting on Challonge. Completed tournaments are kept in the mirror as a local
+archive, which the catalog searches for lookups that include ended tournaments.
+
+The mirror is available using the following code:
+- bot.mirror # In this file
+- self.bot.mirror # In cogs
+"""
+bot.mirror = ChallongeMirror(
+    bot.challonge,
+    db_manager.database,
+    bot.catalog,
+    logger,
+    subdomains=config.challonge_subdomains,
+)
+bot.catalog.archive = bot.mirror
+
+"""
+Create the admission controller that caps Quickfire tournaments at 16 players from a cached roster.
+
+The controller is available using the following code:
+- bot.admission # In this file
+- self.bot.admission # In cogs
+"""
+bot.admission = AdmissionController(bot.mirror)
+
+"""
+Create the pool of pre-created Quickfire tournaments, so the next Quickfire opens as soon as one fills.
+
+The pool is available using the following code:
+- bot.tournament_pool # In this file
+- self.bot.tournament_pool # In cogs
+"""
+bot.tournament_pool = TournamentPool(bot.challonge, bot.catalog, logger)
+
+"""
+Create a pool of warm headless browsers used to screenshot Challonge brackets.
+
+The pool is available using the following code:
+- bot.browser_pool # In this file
+- self.bot.browser_pool # In cogs
+"""
+bot.browser_pool = BrowserPool()
+
+"""
+Create the bracket image cache and the bracket renderer. The renderer draws brackets in worker processes, falls back
+to the browser pool for tournament types it cannot draw and caches the images per tournament version. Setting
+"bracket_cache_dir" in the config also keeps the rendered images on disk.
+
+These are available using the following code:
+- bot.bracket_cache / bot.bracket_renderer # In this file
+- self.bot.bracket_cache / self.bot.bracket_renderer # In cogs
+"""
+bot.bracket_cache = BracketCache(directory=config.bracket_cache_dir)
+bot.bracket_renderer = BracketRenderer(bot.challonge, bot.browser_pool, bot.bracket_cache)
+
+"""
+Create the background queue that re-renders brackets right after a match is reported.
+
+The queue is available using the following code:
+- bot.bracket_queue # In this file
+- self.bot.bracket_queue # In cogs
+"""
+bot.bracket_queue = BracketRenderQueue(bot.bracket_renderer, logger)
+
 
 @bot.event
 async def on_ready():
@@ -128,7 +270,7 @@ async def on_ready():
     bot.logger.info(f"Running on: {platform.system()} {platform.release()} ({os.name})")
     bot.logger.info("-------------------")
     status_task.start()
-    if config["sync_commands_globally"]:
+    if bot.config.sync_commands_globally:
         bot.logger.info("Syncing commands globally...")
         await bot.tree.sync()
 
@@ -281,6 +423,33 @@ async def load_cogs():
                 bot.logger.error(f"Failed to load extension {extension}\n{exception}")
 
 
-asyncio.run(init_db())
-asyncio.run(load_cogs())
-bot.run(config["token"])
+async def main():
+    """
+    Runs the bot, the database setup and the cogs on a single event loop and releases shared resources on shutdown.
+    """
+    async with bot:
+        await init_db()
+        bot.config.start()
+        bot.mirror.start()
+        bot.tournament_pool.start()
+        await load_cogs()
+        try:
+            await bot.start(config.token)
+        finally:
+            await bot.config.close()
+            await bot.tournament_pool.close()
+            await bot.mirror.close()
+            await bot.challonge.close()
+            await bot.browser_pool.close()
+            bot.bracket_queue.close()
+            bot.bracket_renderer.close()
+            await db_manager.database.close()
+
+
+try:
+    asyncio.run(main())
+except KeyboardInterrupt:
+    pass
+finally:
+    # Write out the records still on the queue
+    log_listener.stop()
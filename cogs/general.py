@@ -72,7 +72,7 @@ class General(commands.Cog, name="General"):
         )
         embed.add_field(
             name="Prefix:",
-            value=f"/ (Slash Commands) or {self.bot.config['prefix']} for normal commands",
+            value=f"/ (Slash Commands) or {self.bot.config.prefix} for normal commands",
             inline=False,
         )
         embed.set_footer(text=f"Requested by {context.author}")
@@ -123,7 +123,7 @@ class General(commands.Cog, name="General"):
     #     :param context: The hybrid command context.
     #     """
     #     embed = discord.Embed(
-    #         description=f"Invite me by clicking [here](https://discordapp.com/oauth2/authorize?&client_id={self.bot.config['application_id']}&scope=bot+applications.commands&permissions={self.bot.config['permissions']}).",
+    #         description=f"Invite me by clicking [here](https://discordapp.com/oauth2/authorize?&client_id={self.bot.config.application_id}&scope=bot+applications.commands&permissions={self.bot.config.permissions}).",
     #         colour = discord.Colour.dark_purple(),
     #     )
     #     try:
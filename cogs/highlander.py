@@ -1,22 +1,21 @@
-import challonge
 import discord
+import io
 from discord.ext import commands
 from discord.ext.commands import Context
 from tabulate import tabulate
-import os
-import tempfile
-from selenium import webdriver
-from webdriver_manager.chrome import ChromeDriverManager
+
+from helpers.models import Roster, Tournament
+from helpers.name_index import choices
 
 
 class Highlander(commands.Cog, name="Highlander"):
     def __init__(self, bot):
         self.bot = bot
 
-        # Set Challonge API credentials
-        key = self.bot.config["CHALLONGE_KEY"]
-        user = self.bot.config["CHALLONGE_USER"]
-        challonge.set_credentials(user, key)
+        # Shared asynchronous Challonge client, tournament catalog and local mirror of Challonge data
+        self.challonge = bot.challonge
+        self.catalog = bot.catalog
+        self.mirror = bot.mirror
 
     @commands.hybrid_group(
         name="hl",
@@ -60,10 +59,10 @@ class Highlander(commands.Cog, name="Highlander"):
         community_name = "hrhighlander"
 
         # Searches through all pending tournaments and get the current Highlander tournament if there is one.
-        tournaments = challonge.tournaments.index(state='pending', subdomain=community_name)
+        tournaments = await self.catalog.list(subdomain=community_name, state='pending')
         highlander_tournament = None
         for t in tournaments:
-            if 'Highlander'.lower() in t['name'].lower():
+            if 'Highlander'.lower() in t.name.lower():
                 highlander_tournament = t
                 break
 
@@ -75,10 +74,10 @@ class Highlander(commands.Cog, name="Highlander"):
             )
             await context.send(embed=embed)
         else:
-            participants = challonge.participants.index(highlander_tournament['id'])
+            roster = Roster.from_api(await self.challonge.participants.index(highlander_tournament.id))
 
             # Check if the participant name already exists
-            if any(p['name'].lower() == participant_name.lower() for p in participants):
+            if participant_name.lower() in roster.by_name:
                 embed = discord.Embed(
                     title='Error!',
                     description=f'IGN "{participant_name}" is already signed up.',
@@ -86,10 +85,11 @@ class Highlander(commands.Cog, name="Highlander"):
                 )
                 await context.send(embed=embed)
             else:
-                participant = challonge.participants.create(highlander_tournament['id'], participant_name)
+                participant = await self.challonge.participants.create(highlander_tournament.id, participant_name)
+                await self.mirror.put_participant(highlander_tournament.id, participant)
                 embed = discord.Embed(
                     title="Participant Added",
-                    description=f'"{participant["name"]}" has been added to {highlander_tournament["name"]}',
+                    description=f'"{participant["name"]}" has been added to {highlander_tournament.name}',
                     colour=discord.Colour.dark_blue(),
                 )
                 await context.send(embed=embed)
@@ -112,15 +112,15 @@ class Highlander(commands.Cog, name="Highlander"):
         community_name = "hrhighlander"
 
         # Searches through all pending and in progress tournaments and get the current Highlander tournament if there is one.
-        pending_tournaments = challonge.tournaments.index(state='pending', subdomain=community_name)
-        in_progress_tournaments = challonge.tournaments.index(state='in progress', subdomain=community_name)
+        pending_tournaments = await self.catalog.list(subdomain=community_name, state='pending')
+        in_progress_tournaments = await self.catalog.list(subdomain=community_name, state='in progress')
 
         # Combine both lists
         tournaments = pending_tournaments + in_progress_tournaments
 
         highlander_tournament = None
         for t in tournaments:
-            if 'Highlander'.lower() in t['name'].lower():
+            if 'Highlander'.lower() in t.name.lower():
                 highlander_tournament = t
                 break
 
@@ -132,11 +132,11 @@ class Highlander(commands.Cog, name="Highlander"):
             )
             await context.send(embed=embed)
         else:
-            participants = challonge.participants.index(highlander_tournament['id'])
-            participant_names = [p['name'] for p in participants]
+            participants = await self.mirror.participants(highlander_tournament.id, subdomain=community_name)
+            participant_names = [p.name for p in participants]
             participant_list = '\n'.join(participant_names)
             embed = discord.Embed(
-                title=f'Participants in tournament "{highlander_tournament["name"]}"',
+                title=f'Participants in tournament "{highlander_tournament.name}"',
                 description=participant_list,
                 colour=discord.Colour.dark_magenta(),
             )
@@ -160,10 +160,10 @@ class Highlander(commands.Cog, name="Highlander"):
         announcement_role = discord.utils.get(context.guild.roles, name="highlander")
 
         # Searches through all pending tournaments and get the current Highlander tournament if there is one.
-        tournaments = challonge.tournaments.index(state='in progress', subdomain=community_name)
+        tournaments = await self.catalog.list(subdomain=community_name, state='in progress')
         highlander_tournament = None
         for t in tournaments:
-            if 'Highlander'.lower() in t['name'].lower():
+            if 'Highlander'.lower() in t.name.lower():
                 highlander_tournament = t
                 break
 
@@ -176,23 +176,22 @@ class Highlander(commands.Cog, name="Highlander"):
             await context.send(embed=embed)
 
         else:
-            matches = challonge.matches.index(highlander_tournament['id'], state='open', subdomain=community_name)
-            participants = challonge.participants.index(highlander_tournament['id'])
-            participant_ids = {p['id']: p for p in participants}
+            matches = await self.mirror.matches(highlander_tournament.id, subdomain=community_name, state='open')
+            roster = await self.mirror.roster(highlander_tournament.id, subdomain=community_name)
             bracket = []
             for match in matches:
-                if match['player1_id'] is not None and match['player2_id'] is not None:
-                    p1_name = participant_ids[match['player1_id']]['name']
-                    p2_name = participant_ids[match['player2_id']]['name']
+                if match.player1_id is not None and match.player2_id is not None:
+                    p1_name = roster.by_id[match.player1_id].name
+                    p2_name = roster.by_id[match.player2_id].name
                 else:
                     p1_name = "TBD"
                     p2_name = "TBD"
-                round_num = match.get('round', 'N/A')
-                bracket.append((match['id'], p1_name, p2_name, round_num))
+                round_num = match.round if match.round is not None else 'N/A'
+                bracket.append((match.id, p1_name, p2_name, round_num))
             bracket_str = tabulate(bracket, headers=["Match ID", "Player 1", "Player 2", "Round"])
 
             embed = discord.Embed(
-                title=highlander_tournament["name"],
+                title=highlander_tournament.name,
                 description='Tournament Bracket',
                 colour=discord.Colour.dark_green(),
             )
@@ -216,10 +215,10 @@ class Highlander(commands.Cog, name="Highlander"):
         community_name = "hrhighlander"
 
         # Searches through all in progress tournaments and get the current Highlander tournament if there is one.
-        tournaments = challonge.tournaments.index(state='in progress', subdomain=community_name)
+        tournaments = await self.catalog.list(subdomain=community_name, state='in progress')
         highlander_tournament = None
         for t in tournaments:
-            if 'Highlander'.lower() in t['name'].lower():
+            if 'Highlander'.lower() in t.name.lower():
                 highlander_tournament = t
                 break
 
@@ -232,11 +231,11 @@ class Highlander(commands.Cog, name="Highlander"):
             await context.send(embed=embed)
         else:
             # Get the tournament URL
-            tournament_url = highlander_tournament['full_challonge_url']
+            tournament_url = highlander_tournament.full_challonge_url
 
             # Create an embed with the tournament bracket URL
             embed = discord.Embed(
-                title=f'Tournament Bracket for "{highlander_tournament["name"]}"',
+                title=f'Tournament Bracket for "{highlander_tournament.name}"',
                 description=f'[View the bracket here]({tournament_url})',
                 colour=discord.Colour.dark_gold(),
             )
@@ -259,10 +258,10 @@ class Highlander(commands.Cog, name="Highlander"):
         community_name = "hrhighlander"
 
         # Searches through all pending tournaments and get the current Highlander tournament if there is one.
-        tournaments = challonge.tournaments.index(state='in progress', subdomain=community_name)
+        tournaments = await self.catalog.list(subdomain=community_name, state='in progress')
         highlander_tournament = None
         for t in tournaments:
-            if 'Highlander'.lower() in t['name'].lower():
+            if 'Highlander'.lower() in t.name.lower():
                 highlander_tournament = t
                 break
 
@@ -274,62 +273,24 @@ class Highlander(commands.Cog, name="Highlander"):
             )
             await context.send(embed=embed)
         else:
-            # Get the tournament URL
-            tournament_url = highlander_tournament['live_image_url']
-            # Get number of participants
-            num_participants = highlander_tournament['participants_count']
-
-            # Set the resolution based on the number of participants
-            if num_participants <= 16:
-                resolution = (1000, 650)
-            elif num_participants <= 32:
-                resolution = (1300, 1050)
-            else:
-                resolution = (2000, 2000)
-
-            # Set up the headless browser
-            options = webdriver.ChromeOptions()
-            options.headless = True
-            options.add_argument("--disable-infobars")
-            options.add_argument("--disable-extensions")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-gpu")
-            driver = webdriver.Chrome(ChromeDriverManager().install(), options=options)
-
             try:
-                # Navigate to the tournament URL
-                driver.get(tournament_url)
-
-                # Set the window size
-                driver.set_window_size(*resolution)
-
-                # Take a screenshot of the bracket
-                screenshot = driver.get_screenshot_as_png()
-                driver.quit()
-
-                # Post the screenshot as an image
-                with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                    temp_file.write(screenshot)
-                    temp_file.flush()
-                    embed = discord.Embed(
-                        title=f'Tournament Bracket for "{highlander_tournament["name"]}"',
-                        colour=discord.Colour.dark_gold(),
-                    )
-                    await context.send(
-                        embed=embed,
-                        file=discord.File(temp_file.name,
-                                          filename="bracket.png"))
-                    os.unlink(temp_file.name)
-
-            except Exception as e:
-                driver.quit()
+                # Draw the bracket from the tournament's match data, sized by the number of participants
+                image = await self.bot.bracket_renderer.render(highlander_tournament, subdomain=community_name)
+            except Exception:
                 embed = discord.Embed(
                     title='Error!',
-                    description='Failed to capture the bracket image.',
+                    description='Failed to render the bracket image.',
                     colour=discord.Colour.dark_red(),
                 )
                 await context.send(embed=embed)
+                return
+
+            # Post the bracket as an image
+            embed = discord.Embed(
+                title=f'Tournament Bracket for "{highlander_tournament.name}"',
+                colour=discord.Colour.dark_gold(),
+            )
+            await context.send(embed=embed, file=discord.File(io.BytesIO(image), filename="bracket.png"))
 
     # Define the report command, which allows users to report the result of a match
     @hl.command(
@@ -348,14 +309,14 @@ class Highlander(commands.Cog, name="Highlander"):
         community_name = "hrhighlander"
 
         # Searches through all pending tournaments and get the current Highlander tournament if there is one.
-        tournaments = challonge.tournaments.index(state='in progress', subdomain=community_name)
+        tournaments = await self.catalog.list(subdomain=community_name, state='in progress')
         highlander_tournament = None
 
         # Fetch the highlander role
         announcement_role = discord.utils.get(context.guild.roles, name="Highlander")
 
         for t in tournaments:
-            if 'Highlander'.lower() in t['name'].lower():
+            if 'Highlander'.lower() in t.name.lower():
                 highlander_tournament = t
                 break
 
@@ -368,10 +329,10 @@ class Highlander(commands.Cog, name="Highlander"):
             await context.send(embed=embed)
         else:
             # Fetch all open matches in the tournament
-            matches = challonge.matches.index(highlander_tournament['id'], state='open', subdomain=community_name)
+            matches = await self.challonge.matches.index(highlander_tournament.id, state='open', subdomain=community_name)
 
             # Get participants of the tournament
-            participants = challonge.participants.index(highlander_tournament['id'])
+            roster = Roster.from_api(await self.challonge.participants.index(highlander_tournament.id))
 
             # Store the original winner name
             original_winner_name = winner
@@ -380,10 +341,10 @@ class Highlander(commands.Cog, name="Highlander"):
             winner = winner.lower()
 
             # Find the winner in the list of participants
-            winner_participant = next((p for p in participants if p["name"].lower() == winner), None)
+            winner_participant = roster.by_name.get(winner)
 
             # Determine the winner's ID
-            winner_id = winner_participant['id']
+            winner_id = winner_participant.id
 
             # Find the match which is the correct round and includes the winner id
             match = next((m for m in matches if m['round'] == round_number and (
@@ -393,7 +354,7 @@ class Highlander(commands.Cog, name="Highlander"):
             if match is None:
                 embed = discord.Embed(
                     title="Error",
-                    description=f'Match in round {round_number} not found or already completed in tournament {highlander_tournament["name"]}',
+                    description=f'Match in round {round_number} not found or already completed in tournament {highlander_tournament.name}',
                     colour=discord.Colour.dark_red(),
                 )
                 await context.send(embed=embed)
@@ -421,34 +382,39 @@ class Highlander(commands.Cog, name="Highlander"):
                     scores_csv = "1-0" if winner_id == match['player1_id'] else "0-1"
 
                     # Update the match and mark it as complete
-                    challonge.matches.update(
-                        highlander_tournament['id'],
+                    match = await self.challonge.matches.update(
+                        highlander_tournament.id,
                         match['id'],
                         scores_csv=scores_csv,
                         winner_id=winner_id
                     )
+                    # The cached bracket image no longer matches the tournament, render a fresh one in the background
+                    await self.bot.bracket_cache.invalidate(highlander_tournament.id)
+                    self.bot.bracket_queue.schedule(highlander_tournament, subdomain=community_name)
                     embed = discord.Embed(
                         title='Match Reported',
-                        description=f'Match result reported for match in round {round_number} in tournament {highlander_tournament["name"]}. {original_winner_name} won 1-0',
+                        description=f'Match result reported for match in round {round_number} in tournament {highlander_tournament.name}. {original_winner_name} won 1-0',
                         colour=discord.Colour.dark_blue(),
                     )
                     await context.send(embed=embed)
 
-                    # Check if all matches are completed
-                    matches = challonge.matches.index(highlander_tournament['id'], state='all', subdomain=community_name)
-                    if all(m['state'] == 'complete' for m in matches):
+                    # Check if all matches are completed, using the mirrored matches updated with this result
+                    if await self.mirror.record_match(highlander_tournament.id, match, subdomain=community_name):
                         # Finalize the tournament
-                        challonge.tournaments.finalize(highlander_tournament['id'], subdomain=community_name)
+                        await self.challonge.tournaments.finalize(highlander_tournament.id, subdomain=community_name)
+                        await self.mirror.invalidate(highlander_tournament.id)
+                        self.catalog.invalidate(community_name)
 
                         # Check if the tournament is complete
-                        tournament = challonge.tournaments.show(highlander_tournament['id'], subdomain=community_name)
-                        if tournament['state'] == 'complete':
+                        tournament = Tournament.from_api(
+                            await self.challonge.tournaments.show(highlander_tournament.id, subdomain=community_name))
+                        if tournament.state == 'complete':
                             # Find the winner in the list of participants
-                            final_winner = next((p for p in participants if p["id"] == winner_id), None)
+                            final_winner = roster.by_id.get(winner_id)
 
                             # Create an embed with the winner's information
                             embed = discord.Embed(
-                                title=f'{highlander_tournament["name"]} is complete!',
+                                title=f'{highlander_tournament.name} is complete!',
                                 description=f'{announcement_role.mention}\n\nCongratulations to the winner: {original_winner_name}',
                                 colour=discord.Colour.dark_gold(),
                             )
@@ -490,10 +456,10 @@ class Highlander(commands.Cog, name="Highlander"):
         announcement_role = discord.utils.get(context.guild.roles, name="Highlander")
 
         # Get the list of all tournaments
-        tournaments = challonge.tournaments.index(state='pending', subdomain=community_name)
+        tournaments = await self.catalog.list(subdomain=community_name, state='pending')
         highlander_tournament = None
         for t in tournaments:
-            if 'Highlander'.lower() in t['name'].lower():
+            if 'Highlander'.lower() in t.name.lower():
                 highlander_tournament = t
                 break
 
@@ -506,16 +472,32 @@ class Highlander(commands.Cog, name="Highlander"):
             await context.send(embed=embed)
         else:
             # Randomize seeds before starting the tournament
-            challonge.participants.randomize(highlander_tournament['id'])
+            await self.challonge.participants.randomize(highlander_tournament.id)
 
-            challonge.tournaments.start(highlander_tournament['id'], subdomain=community_name)
+            await self.challonge.tournaments.start(highlander_tournament.id, subdomain=community_name)
+            await self.mirror.invalidate(highlander_tournament.id)
+            self.catalog.invalidate(community_name)
             embed = discord.Embed(
                 title="Tournament Started",
-                description=f'{announcement_role.mention}\n{highlander_tournament["name"]} has started!',
+                description=f'{announcement_role.mention}\n{highlander_tournament.name} has started!',
                 colour=discord.Colour.dark_blue(),
             )
             await context.send(embed=embed)
 
+    # Autocomplete handler, served from the cached tournament catalog and mirror without calling Challonge
+    @report.autocomplete("winner")
+    async def winner_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
+        # Challonge community (subdomain) hosting the tournament
+        community_name = "hrhighlander"
+
+        # The current Highlander tournament, if it is cached
+        names = self.catalog.complete('', subdomain=community_name, state='in progress',
+                                      accept=lambda t: 'highlander' in t.name.lower(), limit=1)
+        if not names:
+            return []
+        highlander_tournament = self.catalog.peek(names[0], subdomain=community_name, state='in progress')
+        return choices(await self.mirror.complete_participant(highlander_tournament.id, current))
+
 
 async def setup(bot):
     await bot.add_cog(Highlander(bot))
@@ -1,14 +1,13 @@
-import challonge
+import asyncio
 import discord
-import time
-import re
+import io
 from discord.ext import commands
 from discord.ext.commands import Context
 from tabulate import tabulate
-import os
-import tempfile
-from selenium import webdriver
-from webdriver_manager.chrome import ChromeDriverManager
+
+from helpers.admission import DUPLICATE, FULL
+from helpers.models import Roster, Tournament
+from helpers.name_index import choices
 
 
 # Define the Quickfire class, which is a subclass of commands.Cog
@@ -16,10 +15,16 @@ class Quickfire(commands.Cog, name="Quickfire"):
     def __init__(self, bot):
         self.bot = bot
 
-        # Set Challonge API credentials
-        key = self.bot.config["CHALLONGE_KEY"]
-        user = self.bot.config["CHALLONGE_USER"]
-        challonge.set_credentials(user, key)
+        # Shared asynchronous Challonge client, tournament catalog and local mirror of Challonge data
+        self.challonge = bot.challonge
+        self.catalog = bot.catalog
+        self.mirror = bot.mirror
+
+        # Admission of signups to the 16-player Quickfire tournaments
+        self.admission = bot.admission
+
+        # Rollovers still running after their command returned
+        self._background_tasks = set()
 
     @commands.hybrid_group(
         name="qf",
@@ -40,7 +45,7 @@ class Quickfire(commands.Cog, name="Quickfire"):
                             "`show_tournaments` - Lists the Quickfire tournaments that are open or in progress.\n"
                             "`show_matches` - Lists the matches in a specified Quickfire tournament.\n"
                             "`bracket_link` - Posts the link to a Quickfire tournament bracket in Challonge.\n"
-                            "`bracket` - Posts screenshot of current Challonge bracket for a specified Quickfire tournament.\n"
+                            "`bracket` - Posts an image of the current Challonge bracket for a specified Quickfire tournament.\n"
                             "`report` - Allows user to report a match result for a specific Quickfire tournament.\n",
 
                 colour=discord.Colour.dark_orange(),
@@ -70,11 +75,8 @@ class Quickfire(commands.Cog, name="Quickfire"):
             await context.send(embed=embed)
             return
 
-        # Get the list of all pending tournaments
-        tournaments = challonge.tournaments.index(state='pending')
-
         # Find the tournament by its name
-        tournament = next((t for t in tournaments if t['name'].lower() == tournament_name.lower()), None)
+        tournament = await self.catalog.get(tournament_name, state='pending')
         if tournament is None:
             embed = discord.Embed(
                 title='Error!',
@@ -83,60 +85,90 @@ class Quickfire(commands.Cog, name="Quickfire"):
             )
             await context.send(embed=embed)
         else:
-            # If the tournament exists, check the number of participants
-            participants = challonge.participants.index(tournament['id'])
-            num_participants = len(participants)
-            if num_participants < 16:
-                # Check if the participant name already exists
-                if any(p['name'].lower() == participant_name.lower() for p in participants):
-                    embed = discord.Embed(
-                        title='Error!',
-                        description=f'IGN "{participant_name}" is already signed up.',
-                        colour=discord.Colour.dark_red(),
-                    )
-                    await context.send(embed=embed)
-                else:
-                    participant = challonge.participants.create(tournament['id'], participant_name)
-                    num_participants += 1
-                    embed = discord.Embed(
-                        title="Participant Added",
-                        description=f'Participant "{participant["name"]}" has been added to tournament "{tournament_name}"',
-                        colour=discord.Colour.dark_blue(),
-                    )
-                    await context.send(embed=embed)
-                    # Gives user the Quickfire Role
-                    role = discord.utils.get(context.guild.roles, id=1104624377313624066)
-                    if role is not None:
-                        await context.author.add_roles(role)
-
-                # Check the number of participants to see if we are at 16 after adding the player.
-                num_participants = len(challonge.participants.index(tournament['id']))
-                if num_participants == 16:
-                    # Start the tournament and create a new tournament with the same name but new number at the end.
-                    challonge.participants.randomize(tournament['id'])
-                    challonge.tournaments.start(tournament['id'])
-
-                    # Extract old tournament number and increment it by 1 for the new tournament
-                    old_number = int(''.join(filter(str.isdigit, tournament_name)))
-                    new_number = old_number + 1
-
-                    # Replace the old number in the tournament_name with the new number
-                    new_tournament_name = tournament_name.replace(str(old_number), str(new_number))
-
-                    # Remove all characters except letters, numbers, and underscores
-                    sanitized_tournament_name = re.sub(r'[^a-zA-Z0-9_]', '', tournament_name)
-
-                    # Generate the unique URL using the sanitized tournament name and current timestamp
-                    unique_url = f"{sanitized_tournament_name}{int(time.time())}"
-                    new_tournament = challonge.tournaments.create(new_tournament_name,
-                                                                  url=unique_url,
-                                                                  game_name="Hero Realms Digital")
-                    embed = discord.Embed(
-                        title='Full Tournament',
-                        description=f'Tournament "{tournament_name}" has started! A new tournament "{new_tournament_name}" has been created.',
-                        colour=discord.Colour.dark_gold(),
-                    )
-                    await context.send(embed=embed)
+            # Admit the player against the cached roster, which also rejects duplicate IGNs and a full tournament
+            outcome, participant, fills = await self.admission.admit(
+                tournament.id, participant_name,
+                lambda: self.challonge.participants.create(tournament.id, participant_name))
+            if outcome == DUPLICATE:
+                embed = discord.Embed(
+                    title='Error!',
+                    description=f'IGN "{participant_name}" is already signed up.',
+                    colour=discord.Colour.dark_red(),
+                )
+                await context.send(embed=embed)
+            elif outcome == FULL:
+                embed = discord.Embed(
+                    title="Tournament Full",
+                    description=f'The tournament "{tournament_name}" is full with 16 participants',
+                    colour=discord.Colour.dark_red(),
+                )
+                await context.send(embed=embed)
+            else:
+                await self.mirror.put_participant(tournament.id, participant)
+                embed = discord.Embed(
+                    title="Participant Added",
+                    description=f'Participant "{participant["name"]}" has been added to tournament "{tournament_name}"',
+                    colour=discord.Colour.dark_blue(),
+                )
+                await context.send(embed=embed)
+                # Gives user the Quickfire Role
+                role = discord.utils.get(context.guild.roles, id=1104624377313624066)
+                if role is not None:
+                    await context.author.add_roles(role)
+
+            # Only the signup that filled the tournament starts it and creates the next one, in the background
+            if fills:
+                task = asyncio.create_task(self._start_and_roll_over(context, tournament, tournament_name))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+
+    async def _start_and_roll_over(self, context: Context, tournament: Tournament, tournament_name: str):
+        """
+        Swaps in the next Quickfire tournament from the pool, then starts the full one.
+
+        This runs in the background, after the player who filled the tournament got their confirmation.
+
+        :param context: The hybrid command context.
+        :param tournament: The full tournament.
+        :param tournament_name: The tournament name.
+        """
+        try:
+            # Extract old tournament number and increment it by 1 for the new tournament
+            old_number = int(''.join(filter(str.isdigit, tournament_name)))
+            new_number = old_number + 1
+
+            # Replace the old number in the tournament_name with the new number
+            new_tournament_name = tournament_name.replace(str(old_number), str(new_number))
+
+            # Open signups for the next tournament first, taking a pre-created one from the pool. A retry after a
+            # failed start finds it already open.
+            if await self.catalog.get(new_tournament_name, state='pending') is None:
+                await self.bot.tournament_pool.take(new_tournament_name)
+
+            # Start the full tournament
+            await self.challonge.participants.randomize(tournament.id)
+            await self.challonge.tournaments.start(tournament.id)
+            await self.mirror.invalidate(tournament.id)
+            self.admission.forget(tournament.id)
+            self.catalog.invalidate()
+        except Exception as e:
+            # Reload the roster on the next signup, which then retries the roll-over
+            self.admission.forget(tournament.id)
+            self.bot.logger.error(f"Failed to roll {tournament_name} over: {e}")
+            embed = discord.Embed(
+                title='Error!',
+                description=f'Tournament "{tournament_name}" is full, but starting it failed: {e}',
+                colour=discord.Colour.dark_red(),
+            )
+            await context.send(embed=embed)
+            return
+
+        embed = discord.Embed(
+            title='Full Tournament',
+            description=f'Tournament "{tournament_name}" has started! A new tournament "{new_tournament_name}" has been created.',
+            colour=discord.Colour.dark_gold(),
+        )
+        await context.send(embed=embed)
 
     # Define the show_participants command, which allows a tournament organizer to view the list of participants in a tournament
     @qf.command(
@@ -160,8 +192,8 @@ class Quickfire(commands.Cog, name="Quickfire"):
             await context.send(embed=embed)
             return
 
-        tournaments = challonge.tournaments.index(state='all')
-        tournament = next((t for t in tournaments if t['name'].lower() == tournament_name.lower()), None)
+        # Find the tournament by its name
+        tournament = await self.catalog.get(tournament_name)
         if tournament is None:
             embed = discord.Embed(
                 title='Error!',
@@ -170,8 +202,8 @@ class Quickfire(commands.Cog, name="Quickfire"):
             )
             await context.send(embed=embed)
         else:
-            participants = challonge.participants.index(tournament['id'])
-            participant_names = [p['name'] for p in participants]
+            participants = await self.mirror.participants(tournament.id)
+            participant_names = [p.name for p in participants]
             participant_list = '\n'.join(participant_names)
             embed = discord.Embed(
                 title=f'Participants in tournament "{tournament_name}"',
@@ -202,8 +234,8 @@ class Quickfire(commands.Cog, name="Quickfire"):
             await context.send(embed=embed)
             return
 
-        tournaments = challonge.tournaments.index(state='in progress')
-        tournament = next((t for t in tournaments if t['name'].lower() == tournament_name.lower()), None)
+        # Find the tournament by its name
+        tournament = await self.catalog.get(tournament_name, state='in progress')
         if tournament is None:
             embed = discord.Embed(
                 title='Error!',
@@ -212,19 +244,18 @@ class Quickfire(commands.Cog, name="Quickfire"):
             )
             await context.send(embed=embed)
         else:
-            matches = challonge.matches.index(tournament['id'], state='open')
-            participants = challonge.participants.index(tournament['id'])
-            participant_ids = {p['id']: p for p in participants}
+            matches = await self.mirror.matches(tournament.id, state='open')
+            roster = await self.mirror.roster(tournament.id)
             bracket = []
             for match in matches:
-                if match['player1_id'] is not None and match['player2_id'] is not None:
-                    p1_name = participant_ids[match['player1_id']]['name']
-                    p2_name = participant_ids[match['player2_id']]['name']
+                if match.player1_id is not None and match.player2_id is not None:
+                    p1_name = roster.by_id[match.player1_id].name
+                    p2_name = roster.by_id[match.player2_id].name
                 else:
                     p1_name = "TBD"
                     p2_name = "TBD"
-                round_num = match.get('round', 'N/A')
-                bracket.append((match['id'], p1_name, p2_name, round_num))
+                round_num = match.round if match.round is not None else 'N/A'
+                bracket.append((match.id, p1_name, p2_name, round_num))
             bracket_str = tabulate(bracket, headers=["Match ID", "Player 1", "Player 2", "Round"])
     
             embed = discord.Embed(
@@ -258,14 +289,14 @@ class Quickfire(commands.Cog, name="Quickfire"):
             )
             await context.send(embed=embed)
             return
-        tournaments = challonge.tournaments.index(state='in progress')
-        tournament = next((t for t in tournaments if t['name'].lower() == tournament_name.lower()), None)
+        # Find the tournament by its name
+        tournament = await self.catalog.get(tournament_name, state='in progress')
 
         if tournament is None:
             await context.send(f'Tournament "{tournament_name}" not found')
         else:
             # Get the tournament URL
-            tournament_url = tournament['full_challonge_url']
+            tournament_url = tournament.full_challonge_url
 
             # Create an embed with the tournament bracket URL
             embed = discord.Embed(
@@ -277,11 +308,11 @@ class Quickfire(commands.Cog, name="Quickfire"):
 
     @qf.command(
         name="bracket",
-        description="Displays a screenshot of the tournament bracket.",
+        description="Displays an image of the tournament bracket.",
     )
     async def bracket(self, context: Context, tournament_name: str):
         """
-        Displays a screenshot of the tournament bracket.
+        Displays an image of the tournament bracket.
 
         :param context: The command context.
         :param tournament_name: Tournament name.
@@ -298,8 +329,8 @@ class Quickfire(commands.Cog, name="Quickfire"):
             await context.send(embed=embed)
             return
 
-        tournaments = challonge.tournaments.index(state='in progress')
-        tournament = next((t for t in tournaments if t['name'].lower() == tournament_name.lower()), None)
+        # Find the tournament by its name
+        tournament = await self.catalog.get(tournament_name, state='in progress')
 
         if tournament is None:
             embed = discord.Embed(
@@ -309,52 +340,24 @@ class Quickfire(commands.Cog, name="Quickfire"):
             )
             await context.send(embed=embed)
         else:
-            # Get the tournament URL
-            tournament_url = tournament['live_image_url']
-
-            # Set up the headless browser
-            options = webdriver.ChromeOptions()
-            options.headless = True
-            options.add_argument("--disable-infobars")
-            options.add_argument("--disable-extensions")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-gpu")
-            driver = webdriver.Chrome(ChromeDriverManager().install(), options=options)
-
             try:
-                # Navigate to the tournament URL
-                driver.get(tournament_url)
-
-                # Set the window size
-                driver.set_window_size(1000, 650)
-
-                # Take a screenshot of the bracket
-                screenshot = driver.get_screenshot_as_png()
-                driver.quit()
-
-                # Post the screenshot as an image
-                with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                    temp_file.write(screenshot)
-                    temp_file.flush()
-                    embed = discord.Embed(
-                        title=f'Tournament Bracket for "{tournament_name}"',
-                        colour=discord.Colour.dark_gold(),
-                    )
-                    await context.send(
-                        embed=embed,
-                        file=discord.File(temp_file.name,
-                                          filename="bracket.png"))
-                    os.unlink(temp_file.name)
-
-            except Exception as e:
-                driver.quit()
+                # Draw the bracket from the tournament's match data, sized by the number of participants
+                image = await self.bot.bracket_renderer.render(tournament)
+            except Exception:
                 embed = discord.Embed(
                     title='Error!',
-                    description='Failed to capture the bracket image.',
+                    description='Failed to render the bracket image.',
                     colour=discord.Colour.dark_red(),
                 )
                 await context.send(embed=embed)
+                return
+
+            # Post the bracket as an image
+            embed = discord.Embed(
+                title=f'Tournament Bracket for "{tournament_name}"',
+                colour=discord.Colour.dark_gold(),
+            )
+            await context.send(embed=embed, file=discord.File(io.BytesIO(image), filename="bracket.png"))
 
     # Define the show_tournaments command, which lists all current tournaments and their status
     @qf.command(
@@ -367,16 +370,16 @@ class Quickfire(commands.Cog, name="Quickfire"):
 
         :param context: The hybrid command context.
         """
-        tournaments = challonge.tournaments.index(state='all')
+        tournaments = await self.catalog.list(state='pending') + await self.catalog.list(state='in progress')
         embed = discord.Embed(
             title='Quickfire Tournament List',
             description='All currently in progress or pending Quickfire tournaments.',
             colour=discord.Colour.dark_green(),
         )
         for tournament in tournaments:
-            if 'quickfire' in tournament['name'].lower() and tournament['state'] != 'complete':
-                embed.add_field(name=tournament['name'],
-                                value=f"Status: {tournament['state']}",
+            if 'quickfire' in tournament.name.lower():
+                embed.add_field(name=tournament.name,
+                                value=f"Status: {tournament.state}",
                                 inline=False)
         await context.send(embed=embed)
 
@@ -407,9 +410,8 @@ class Quickfire(commands.Cog, name="Quickfire"):
         # Fetch the quickfire role
         announcement_role = discord.utils.get(context.guild.roles, name="quickfire")
 
-        # Fetch all in progress tournaments and find the one with the specified name
-        tournaments = challonge.tournaments.index(state='in progress')
-        tournament = next((t for t in tournaments if t['name'].lower() == tournament_name.lower()), None)
+        # Find the tournament by its name
+        tournament = await self.catalog.get(tournament_name, state='in progress')
 
         # If the tournament is not found, send an error message
         if tournament is None:
@@ -421,10 +423,10 @@ class Quickfire(commands.Cog, name="Quickfire"):
             await context.send(embed=embed)
         else:
             # Fetch all open matches in the tournament
-            matches = challonge.matches.index(tournament['id'], state='open')
+            matches = await self.challonge.matches.index(tournament.id, state='open')
 
             # Get participants of the tournament
-            participants = challonge.participants.index(tournament['id'])
+            roster = Roster.from_api(await self.challonge.participants.index(tournament.id))
 
             # Store the original winner name
             original_winner_name = winner
@@ -433,10 +435,10 @@ class Quickfire(commands.Cog, name="Quickfire"):
             winner = winner.lower()
 
             # Find the winner in the list of participants
-            winner_participant = next((p for p in participants if p["name"].lower() == winner), None)
+            winner_participant = roster.by_name.get(winner)
 
             # Determine the winner's ID
-            winner_id = winner_participant['id']
+            winner_id = winner_participant.id
 
             # Find the match which is the correct round and includes the winner id
             match = next((m for m in matches if m['round'] == round_number and (
@@ -474,12 +476,15 @@ class Quickfire(commands.Cog, name="Quickfire"):
                     scores_csv = "1-0" if winner_id == match['player1_id'] else "0-1"
 
                     # Update the match and mark it as complete
-                    challonge.matches.update(
-                        tournament['id'],
+                    match = await self.challonge.matches.update(
+                        tournament.id,
                         match['id'],
                         scores_csv=scores_csv,
                         winner_id=winner_id
                     )
+                    # The cached bracket image no longer matches the tournament, render a fresh one in the background
+                    await self.bot.bracket_cache.invalidate(tournament.id)
+                    self.bot.bracket_queue.schedule(tournament)
                     embed = discord.Embed(
                         title='Match Reported',
                         description=f'Match result reported for match in round {round_number} in tournament "{tournament_name}. {original_winner_name} won 1-0',
@@ -487,17 +492,18 @@ class Quickfire(commands.Cog, name="Quickfire"):
                     )
                     await context.send(embed=embed)
 
-                    # Check if all matches are completed
-                    matches = challonge.matches.index(tournament['id'], state='all')
-                    if all(m['state'] == 'complete' for m in matches):
+                    # Check if all matches are completed, using the mirrored matches updated with this result
+                    if await self.mirror.record_match(tournament.id, match):
                         # Finalize the tournament
-                        challonge.tournaments.finalize(tournament['id'])
+                        await self.challonge.tournaments.finalize(tournament.id)
+                        await self.mirror.invalidate(tournament.id)
+                        self.catalog.invalidate()
 
                         # Check if the tournament is complete
-                        tournament = challonge.tournaments.show(tournament['id'])
-                        if tournament['state'] == 'complete':
+                        tournament = Tournament.from_api(await self.challonge.tournaments.show(tournament.id))
+                        if tournament.state == 'complete':
                             # Find the winner in the list of participants
-                            final_winner = next((p for p in participants if p["id"] == winner_id), None)
+                            final_winner = roster.by_id.get(winner_id)
 
                             # Create an embed with the winner's information
                             embed = discord.Embed(
@@ -532,11 +538,8 @@ class Quickfire(commands.Cog, name="Quickfire"):
             await context.send(embed=embed)
             return
 
-        # Get the list of all pending tournaments
-        tournaments = challonge.tournaments.index(state='pending')
-
         # Find the tournament by its name
-        tournament = next((t for t in tournaments if t['name'].lower() == tournament_name.lower()), None)
+        tournament = await self.catalog.get(tournament_name, state='pending')
 
         if tournament is None:
             embed = discord.Embed(
@@ -546,54 +549,68 @@ class Quickfire(commands.Cog, name="Quickfire"):
             )
             await context.send(embed=embed)
         else:
-            # Check the number of participants
-            num_participants = len(challonge.participants.index(tournament['id']))
-            if num_participants < 16:
-                # If the tournament exists, add player to tournament.
-                participant = challonge.participants.create(tournament['id'], player_name)
+            # Admit the player against the cached roster, like a signup
+            outcome, participant, fills = await self.admission.admit(
+                tournament.id, player_name,
+                lambda: self.challonge.participants.create(tournament.id, player_name))
+            if outcome == DUPLICATE:
                 embed = discord.Embed(
-                    title="Participant Added",
-                    description=f'Participant {participant["name"]} added to tournament {tournament["name"]}',
+                    title='Error!',
+                    description=f'IGN "{player_name}" is already signed up.',
                     colour=discord.Colour.dark_red(),
                 )
                 await context.send(embed=embed)
-            else:
+            elif outcome == FULL:
                 embed = discord.Embed(
                     title="Tournament Full",
-                    description=f'The tournament "{tournament_name}" is full with {num_participants} participants',
+                    description=f'The tournament "{tournament_name}" is full with 16 participants',
                     colour=discord.Colour.dark_red(),
                 )
                 await context.send(embed=embed)
-
-            # Check the number of participants to see if we are at 16 after adding the player.
-            num_participants = len(challonge.participants.index(tournament['id']))
-            if num_participants == 16:
-                # Start the tournament and create a new tournament with the same name but new number at the end.
-                challonge.participants.randomize(tournament['id'])
-                challonge.tournaments.start(tournament['id'])
-
-                # Extract old tournament number and increment it by 1 for the new tournament
-                old_number = int(''.join(filter(str.isdigit, tournament_name)))
-                new_number = old_number + 1
-
-                # Replace the old number in the tournament_name with the new number
-                new_tournament_name = tournament_name.replace(str(old_number), str(new_number))
-
-                # Remove all characters except letters, numbers, and underscores
-                sanitized_tournament_name = re.sub(r'[^a-zA-Z0-9_]', '', tournament_name)
-
-                # Generate the unique URL using the sanitized tournament name and current timestamp
-                unique_url = f"{sanitized_tournament_name}{int(time.time())}"
-                new_tournament = challonge.tournaments.create(new_tournament_name,
-                                                              url=unique_url,
-                                                              game_name="Hero Realms Digital")
+            else:
+                await self.mirror.put_participant(tournament.id, participant)
                 embed = discord.Embed(
-                    title='Full Tournament',
-                    description=f'Tournament "{tournament_name}" has started! A new tournament "{new_tournament_name}" has been created.',
-                    colour=discord.Colour.dark_gold(),
+                    title="Participant Added",
+                    description=f'Participant {participant["name"]} added to tournament {tournament.name}',
+                    colour=discord.Colour.dark_red(),
                 )
                 await context.send(embed=embed)
 
+            # Only the signup that filled the tournament starts it and creates the next one, in the background
+            if fills:
+                task = asyncio.create_task(self._start_and_roll_over(context, tournament, tournament_name))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+
+    # Autocomplete handlers, served from the cached tournament catalog and mirror without calling Challonge
+    @signup.autocomplete("tournament_name")
+    @add_player.autocomplete("tournament_name")
+    async def pending_tournament_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
+        return choices(self.catalog.complete(current, state='pending', accept=_is_quickfire))
+
+    @show_players.autocomplete("tournament_name")
+    async def tournament_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
+        return choices(self.catalog.complete(current, accept=_is_quickfire))
+
+    @show_matches.autocomplete("tournament_name")
+    @bracket_link.autocomplete("tournament_name")
+    @bracket.autocomplete("tournament_name")
+    @report.autocomplete("tournament_name")
+    async def in_progress_tournament_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
+        return choices(self.catalog.complete(current, state='in progress', accept=_is_quickfire))
+
+    @report.autocomplete("winner")
+    async def winner_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
+        tournament_name = interaction.namespace.tournament_name
+        tournament = self.catalog.peek(tournament_name, state='in progress') if tournament_name else None
+        if tournament is None:
+            return []
+        return choices(await self.mirror.complete_participant(tournament.id, current))
+
+
+def _is_quickfire(tournament: Tournament) -> bool:
+    return 'quickfire' in tournament.name.lower()
+
 
 # Define the setup function, which adds the Quickfire cog to the Hero-Helper Bot
 async def setup(bot):
@@ -1,20 +1,90 @@
+import asyncio
 import discord
-import challonge
 import time
-import operator
 from discord.ext import commands
 from discord.ext.commands import Context
-from helpers import db_manager, automation
+from exceptions import ChallongeError
+from helpers import db_manager
+from helpers.models import Roster
+from helpers.name_index import choices
+from helpers.rate_limiter import BULK, set_priority
+from helpers.standings import DivisionStandings, StandingsStore
+
+# The number of divisions that season-wide commands work on at the same time
+DIVISION_CONCURRENCY = 4
+
+# The number of role assignments sent to Discord at the same time
+ROLE_CONCURRENCY = 4
 
 
 class Tcl(commands.Cog, name="Thandar Combat League"):
     def __init__(self, bot):
         self.bot = bot
 
-        # Set Challonge API credentials
-        key = self.bot.config["CHALLONGE_KEY"]
-        user = self.bot.config["CHALLONGE_USER"]
-        challonge.set_credentials(user, key)
+        # Shared asynchronous Challonge client, tournament catalog and local mirror of Challonge data
+        self.challonge = bot.challonge
+        self.catalog = bot.catalog
+        self.mirror = bot.mirror
+
+        # Division standings, updated incrementally as matches are reported and reconciled when the mirror
+        # refetches a division that changed on Challonge
+        self.division_standings = StandingsStore()
+        self.mirror.refresh_listeners.append(self.division_standings.reconcile)
+
+    def cog_unload(self):
+        self.mirror.refresh_listeners.remove(self.division_standings.reconcile)
+
+    async def _get_division_standings(self, tournament_id: int, community_name: str, rebuild: bool = False):
+        """
+        Returns the cached standings of a division, building them from the Challonge mirror on a cache miss.
+
+        :param tournament_id: The Challonge tournament ID of the division.
+        :param community_name: The Challonge community (subdomain) hosting the division.
+        :param rebuild: Whether to discard the cached standings and rebuild them from Challonge itself.
+        :return: The division standings.
+        """
+        division = None if rebuild else self.division_standings.get(tournament_id)
+        if division is None:
+            # Retrieve the roster and the matches for the division, refetching them from Challonge on a rebuild
+            if rebuild:
+                details = await self.mirror.refresh(tournament_id, subdomain=community_name)
+            else:
+                details = await self.mirror.tournament(tournament_id, subdomain=community_name)
+            division = DivisionStandings.from_tournament(details)
+            self.division_standings.put(division)
+        return division
+
+    async def _for_each_division(self, context: Context, divisions: list, operation, action: str) -> tuple:
+        """
+        Runs an operation on several divisions concurrently, reporting progress as each division finishes.
+
+        A failing division does not stop the others, its error is reported in the progress message instead.
+
+        :param context: The command context, progress is posted in its channel.
+        :param divisions: The division tournaments.
+        :param operation: A coroutine function called with each division tournament.
+        :param action: What the operation does, e.g. "Starting", used in the progress message.
+        :return: The results of the divisions that succeeded keyed by tournament ID, and the (name, error) pairs of
+            those that failed.
+        """
+        semaphore = asyncio.Semaphore(DIVISION_CONCURRENCY)
+        results = {}
+        failures = []
+        progress = await context.send(embed=_progress_embed(action, divisions, results, failures))
+
+        async def run(division):
+            async with semaphore:
+                try:
+                    results[division.id] = await operation(division)
+                except Exception as e:
+                    failures.append((division.name, e))
+            try:
+                await progress.edit(embed=_progress_embed(action, divisions, results, failures))
+            except discord.HTTPException:
+                pass
+
+        await asyncio.gather(*(run(division) for division in divisions))
+        return results, failures
 
     @commands.hybrid_group(
         name="tcl",
@@ -125,11 +195,8 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
             await context.send(embed=embed)
             return
 
-        # Get all tournaments from the Challonge API
-        tournaments = challonge.tournaments.index(state='all', subdomain=community_name)
-
         # Find the tournament with the specified division name
-        tournament = next((t for t in tournaments if t['name'].lower() == division_name.lower()), None)
+        tournament = await self.catalog.get(division_name, subdomain=community_name)
 
         # Check if the tournament was found
         if tournament is None:
@@ -142,10 +209,10 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
             return
 
         # Get all participants of the found tournament
-        participants = challonge.participants.index(tournament['id'])
+        roster = Roster.from_api(await self.challonge.participants.index(tournament.id))
 
         # Find the participant with the specified winner's name
-        winner = next((p for p in participants if p['name'].lower() == winner_name.lower()), None)
+        winner = roster.by_name.get(winner_name.lower())
 
         # Check if the winner was found
         if winner is None:
@@ -158,11 +225,11 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
             return
 
         # Get all open matches of the tournament
-        matches = challonge.matches.index(tournament['id'], state='open', subdomain=community_name)
+        matches = await self.challonge.matches.index(tournament.id, state='open', subdomain=community_name)
 
         # Find the match with the specified round number and the winner as one of the players
         match = next((m for m in matches if m['round'] == round_number and (
-                    m['player1_id'] == winner['id'] or m['player2_id'] == winner['id'])), None)
+                    m['player1_id'] == winner.id or m['player2_id'] == winner.id)), None)
 
         # Check if the match was found
         if match is None:
@@ -175,14 +242,18 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
             return
 
         # Update the match with the winner's and loser's scores and set the winner
-        if match['player1_id'] == winner['id']:
-            challonge.matches.update(tournament['id'], match['id'],
-                                     scores_csv=f"{games_won_by_winner}-{games_won_by_loser}", winner_id=winner['id'],
-                                     subdomain=community_name)
+        if match['player1_id'] == winner.id:
+            scores_csv = f"{games_won_by_winner}-{games_won_by_loser}"
         else:
-            challonge.matches.update(tournament['id'], match['id'],
-                                     scores_csv=f"{games_won_by_loser}-{games_won_by_winner}", winner_id=winner['id'],
-                                     subdomain=community_name)
+            scores_csv = f"{games_won_by_loser}-{games_won_by_winner}"
+        match = await self.challonge.matches.update(tournament.id, match['id'], scores_csv=scores_csv,
+                                                    winner_id=winner.id, subdomain=community_name)
+        await self.mirror.put_match(tournament.id, match)
+
+        # Apply the result to the cached division standings, if they have been built
+        division = self.division_standings.get(tournament.id)
+        if division is not None:
+            division.record(match['id'], match['player1_id'], match['player2_id'], scores_csv)
 
         # Send a success message to the user
         embed = discord.Embed(
@@ -209,14 +280,8 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
         # Challonge community (subdomain) hosting the tournament
         community_name = "b5d0ca83e61253ea7f84a60c"
 
-        # Retrieve the list of tournaments from Challonge
-        tournaments = challonge.tournaments.index(subdomain=community_name)
-        tournament = None
         # Search for a tournament that matches the provided division name
-        for t in tournaments:
-            if t['name'].lower() == division_name.lower():
-                tournament = t
-                break
+        tournament = await self.catalog.get(division_name, subdomain=community_name)
 
         if tournament is None:
             # If no matching tournament is found, send an error message
@@ -228,61 +293,13 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
             await context.send(embed=embed)
             return
 
-        # Retrieve the matches for the selected tournament
-        matches = challonge.matches.index(tournament["id"], subdomain=community_name)
-
-        # Dictionary to store player statistics
-        players = {}
-        for match in matches:
-            player1_id = match['player1_id']
-            player2_id = match['player2_id']
-
-            # Initialize player statistics if they don't exist in the dictionary
-            if player1_id not in players:
-                players[player1_id] = {"wins": 0, "losses": 0, "match_wins": 0, "match_losses": 0}
-            if player2_id not in players:
-                players[player2_id] = {"wins": 0, "losses": 0, "match_wins": 0, "match_losses": 0}
-
-            if match['scores_csv']:
-                scores = match['scores_csv'].split('-')
-                player1_score = int(scores[0])
-                player2_score = int(scores[1])
-
-                # Update player statistics based on match results
-                players[player1_id]['wins'] += player1_score
-                players[player1_id]['losses'] += player2_score
-                players[player2_id]['wins'] += player2_score
-                players[player2_id]['losses'] += player1_score
-
-                # Increment match wins and losses
-                if player1_score > player2_score:
-                    players[player1_id]['match_wins'] += 1
-                    players[player2_id]['match_losses'] += 1
-                else:
-                    players[player1_id]['match_losses'] += 1
-                    players[player2_id]['match_wins'] += 1
-
-        standings = []
-        for player_id, stats in players.items():
-            # Calculate win percentage for each player
-            win_percentage = round(stats['wins'] / (stats['wins'] + stats['losses']) * 100, 2)
-            # Retrieve player information from Challonge
-            player = challonge.participants.show(tournament["id"], player_id, subdomain=community_name)
-            # Append player statistics to the standings list
-            standings.append({
-                "name": player['name'],
-                "wins": stats['wins'],
-                "losses": stats['losses'],
-                "win_percentage": win_percentage,
-                "match_wins": stats['match_wins']
-            })
-
-        # Sort the standings list based on win percentage and match wins in descending order
-        standings.sort(key=operator.itemgetter('win_percentage', 'match_wins'), reverse=True)
+        # Standings are kept up to date by the report command, so they are only built from Challonge on a cache miss
+        division = await self._get_division_standings(tournament.id, community_name)
+        standings = division.table()
 
         # Create the embed to be sent
         embed = discord.Embed(
-            title=f"{tournament['name'].title()}",
+            title=f"{tournament.name.title()}",
             description="Player Statistics",
             colour=discord.Colour.dark_green(),
         )
@@ -298,6 +315,42 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
         await context.send(embed=embed)
 
     # Start Tournament Organizer specific commands.
+    @tcl.command(
+        base="tcl",
+        name="refresh_standings",
+        description="Rebuilds the standings for a Thandar Combat League division from Challonge.",
+        hidden=True,
+    )
+    @commands.has_role("TCL Organizer")
+    async def refresh_standings(self, context: Context):
+        """
+        Rebuilds the standings for a Thandar Combat League division from Challonge.
+
+        :param context: The hybrid command context.
+        """
+        # Get division_name from channel name and replace "-" with " "
+        division_name = context.channel.name.replace("-", " ")
+
+        # Challonge community (subdomain) hosting the tournament
+        community_name = "b5d0ca83e61253ea7f84a60c"
+
+        tournament = await self.catalog.get(division_name, subdomain=community_name)
+        if tournament is None:
+            embed = discord.Embed(
+                title='Error!',
+                description=f'Division "{division_name}" not found.',
+                colour=discord.Colour.dark_red(),
+            )
+            await context.send(embed=embed)
+            return
+
+        await self._get_division_standings(tournament.id, community_name, rebuild=True)
+        embed = discord.Embed(
+            description=f"Standings for {tournament.name.title()} have been rebuilt.",
+            colour=discord.Colour.dark_blue(),
+        )
+        await context.send(embed=embed)
+
     @tcl.command(
         base="tcl",
         name="remove_waitlist",
@@ -360,14 +413,15 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
         # Creates a unique url based on the tournament name and time
         unique_url = f"{name}{int(time.time())}".replace(" ", "")
         # Adds the tournament into Challonge.
-        new_tournament = challonge.tournaments.create(new_tournament_name,
-                                                      url=unique_url,
-                                                      tournament_type="round robin",
-                                                      game_name="Hero Realms Digital",
-                                                      ranked_by="points scored",
-                                                      subdomain="b5d0ca83e61253ea7f84a60c",
-                                                      tie_breaks=["match wins", "game win percentage", "points scored"]
-                                                      )
+        new_tournament = await self.challonge.tournaments.create(new_tournament_name,
+                                                                 url=unique_url,
+                                                                 tournament_type="round robin",
+                                                                 game_name="Hero Realms Digital",
+                                                                 ranked_by="points scored",
+                                                                 subdomain="b5d0ca83e61253ea7f84a60c",
+                                                                 tie_breaks=["match wins", "game win percentage", "points scored"]
+                                                                 )
+        self.catalog.invalidate("b5d0ca83e61253ea7f84a60c")
 
         # Gets division role id for permissions
         division_role = discord.utils.get(context.guild.roles, name=f"{name}")
@@ -418,14 +472,14 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
         :param division_name: The Thandar Combat League division that the users should be added to.
         :param hr_igns: A string of comma-separated usernames for the users to be added to Thandar Combat League.
         """
+        # Season operations fire bursts of Challonge calls, let player commands go first
+        set_priority(BULK)
+
         # Challonge community (subdomain) hosting the tournament
         community_name = "b5d0ca83e61253ea7f84a60c"
 
-        # Get the list of all tournaments
-        tournaments = challonge.tournaments.index(state='pending', subdomain=community_name)
-
         # Find the tournament by its name
-        tournament = next((t for t in tournaments if t['name'].lower() == division_name.lower()), None)
+        tournament = await self.catalog.get(division_name, subdomain=community_name, state='pending')
 
         if tournament is None:
             embed = discord.Embed(
@@ -436,38 +490,68 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
             await context.send(embed=embed)
         else:
             # If the tournament exists, add the participants.
-            hr_igns_list = [ign.strip() for ign in hr_igns.split(',')]  # Split the input string into a list
-
-            for hr_ign in hr_igns_list:
-                participant = challonge.participants.create(tournament['id'], hr_ign, subdomain=community_name)
-
-                # Get the Discord user ID from the database based on HR IGN
-                user_id = await db_manager.get_user_id_from_db(hr_ign)
-
-                if user_id:
-                    guild = context.guild
-                    member = guild.get_member(user_id)  # Try fetching the member
-
-                    if member is None:
-                        # Member not found, fetch the member using Discord's API
-                        try:
-                            member = await guild.fetch_member(user_id)
-                        except discord.NotFound:
-                            member = None
-
-                    if member:
-                        # Assign the role with the same name as the division to the player
-                        role_name = division_name.title()
-                        role = discord.utils.get(guild.roles, name=role_name)
-                        if role:
-                            await member.add_roles(role)
-
-                embed = discord.Embed(
-                    title="Participant Added",
-                    description=f'Participant {participant["name"]} added to tournament {tournament["name"]}',
-                    colour=discord.Colour.dark_blue(),
-                )
-                await context.send(embed=embed)
+            hr_igns_list = [ign.strip() for ign in hr_igns.split(',') if ign.strip()]  # Split the input string into a list
+
+            # Add every player to Challonge in a single request, if it fails nobody was added
+            add_error = None
+            try:
+                participants = await self.challonge.participants.bulk_add(tournament.id, hr_igns_list,
+                                                                          subdomain=community_name)
+            except ChallongeError as e:
+                participants, add_error = [], e
+            for participant in participants:
+                await self.mirror.put_participant(tournament.id, participant)
+
+            # Get the Discord user IDs of all players from the database in a single query
+            user_ids = await db_manager.get_user_ids_from_db(hr_igns_list)
+
+            # Members that are not cached are fetched together in one gateway request
+            guild = context.guild
+            members = {user_id: guild.get_member(int(user_id)) for user_id in set(user_ids.values())}
+            missing = [int(user_id) for user_id, member in members.items() if member is None]
+            if missing:
+                for member in await guild.query_members(user_ids=missing, limit=len(missing)):
+                    members[str(member.id)] = member
+
+            # Assign the role with the same name as the division to every player, a few at a time
+            role = discord.utils.get(guild.roles, name=division_name.title())
+            semaphore = asyncio.Semaphore(ROLE_CONCURRENCY)
+
+            async def assign_role(member):
+                async with semaphore:
+                    await member.add_roles(role)
+
+            # Players that were not added to the division don't get its role
+            role_targets = [] if role is None or add_error is not None else [
+                m for m in members.values() if m is not None
+            ]
+            role_results = await asyncio.gather(*(assign_role(m) for m in role_targets), return_exceptions=True)
+            role_failures = [m.display_name for m, result in zip(role_targets, role_results)
+                             if isinstance(result, Exception)]
+
+            # Summarize everything in a single message
+            not_linked = [ign for ign in hr_igns_list
+                          if ign.lower() not in user_ids or members.get(user_ids[ign.lower()]) is None]
+            embed = discord.Embed(
+                title="Participants Added",
+                description=f'{len(participants)} participant(s) added to tournament {tournament.name}:\n' +
+                            '\n'.join(p['name'] for p in participants),
+                colour=discord.Colour.dark_blue(),
+            )
+            if add_error is not None:
+                embed.add_field(name="Adding to Challonge failed",
+                                value=f'{str(add_error)[:1000]}\nNo roles assigned.', inline=False)
+            elif role is None:
+                embed.add_field(name="Roles", value=f'Role "{division_name.title()}" not found, no roles assigned.',
+                                inline=False)
+            else:
+                embed.add_field(name="Roles", value=f'"{role.name}" assigned to '
+                                                    f'{len(role_targets) - len(role_failures)} member(s).', inline=False)
+            if not_linked:
+                embed.add_field(name="Not found on Discord", value='\n'.join(not_linked), inline=False)
+            if role_failures:
+                embed.add_field(name="Role assignment failed", value='\n'.join(role_failures), inline=False)
+            await context.send(embed=embed)
 
     @tcl.command(
         base="tcl",
@@ -487,11 +571,8 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
         # Challonge community (subdomain) hosting the tournament
         community_name = "b5d0ca83e61253ea7f84a60c"
 
-        # Get a list of all tournaments in the Challonge community
-        tournaments = challonge.tournaments.index(state='all', subdomain=community_name)
-
         # Find the tournament that matches the provided division name
-        tournament = next((t for t in tournaments if t['name'].lower() == division_name.lower()), None)
+        tournament = await self.catalog.get(division_name, subdomain=community_name)
 
         if tournament is None:
             # If the tournament is not found, display an error message
@@ -503,8 +584,8 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
             await context.send(embed=embed)
         else:
             # If the tournament is found, retrieve the list of participants
-            participants = challonge.participants.index(tournament['id'])
-            participant_names = [p['name'] for p in participants]
+            participants = await self.mirror.participants(tournament.id, subdomain=community_name)
+            participant_names = [p.name for p in participants]
             participant_list = '\n'.join(participant_names)
 
             # Create an embed message with the list of participants and send it
@@ -559,11 +640,8 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
         # Challonge community (subdomain) hosting the tournament
         community_name = "b5d0ca83e61253ea7f84a60c"
 
-        # Get all tournaments from Challonge with the specified subdomain
-        tournaments = challonge.tournaments.index(state='all', subdomain=community_name)
-
         # Find the tournament with the specified division name
-        tournament = next((t for t in tournaments if t['name'].lower() == division_name.lower()), None)
+        tournament = await self.catalog.get(division_name, subdomain=community_name)
 
         if tournament is None:
             # If the tournament is not found, display an error message
@@ -575,27 +653,26 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
             await context.send(embed=embed)
         else:
             # Get the matches for the tournament
-            matches = challonge.matches.index(tournament['id'], state='open', subdomain=community_name)
+            matches = await self.mirror.matches(tournament.id, subdomain=community_name, state='open')
 
             # Get the participants for the tournament
-            participants = challonge.participants.index(tournament['id'])
-            participant_ids = {p['id']: p for p in participants}
+            roster = await self.mirror.roster(tournament.id, subdomain=community_name)
 
             bracket = []
             for match in matches:
-                if match['round'] > max_round:
+                if match.round > max_round:
                     continue
 
                 # Get the names of the players for each match
-                if match['player1_id'] is not None and match['player2_id'] is not None:
-                    p1_name = participant_ids[match['player1_id']]['name']
-                    p2_name = participant_ids[match['player2_id']]['name']
+                if match.player1_id is not None and match.player2_id is not None:
+                    p1_name = roster.by_id[match.player1_id].name
+                    p2_name = roster.by_id[match.player2_id].name
                 else:
                     p1_name = "TBD"
                     p2_name = "TBD"
 
-                round_num = match.get('round', 'N/A')
-                bracket.append((match['id'], p1_name, p2_name, round_num))
+                round_num = match.round if match.round is not None else 'N/A'
+                bracket.append((match.id, p1_name, p2_name, round_num))
 
             # Create an embed to display the matches
             embed = discord.Embed(
@@ -644,11 +721,8 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
         # Challonge community (subdomain) hosting the tournament
         community_name = "b5d0ca83e61253ea7f84a60c"
 
-        # Get the list of all tournaments
-        tournaments = challonge.tournaments.index(state='all', subdomain=community_name)
-
         # Find the tournament by its name
-        tournament = next((t for t in tournaments if t['name'].lower() == division_name.lower()), None)
+        tournament = await self.catalog.get(division_name, subdomain=community_name)
 
         if tournament is None:
             embed = discord.Embed(
@@ -659,12 +733,15 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
             await context.send(embed=embed)
         else:
             # Randomize seeds before starting the tournament
-            challonge.participants.randomize(tournament['id'])
+            await self.challonge.participants.randomize(tournament.id)
 
-            challonge.tournaments.start(tournament['id'], subdomain=community_name)
+            await self.challonge.tournaments.start(tournament.id, subdomain=community_name)
+            await self.mirror.invalidate(tournament.id)
+            self.division_standings.invalidate(tournament.id)
+            self.catalog.invalidate(community_name)
             embed = discord.Embed(
                 title="Division Started",
-                description=f'Thandar Combat League {tournament["name"]} has started!',
+                description=f'Thandar Combat League {tournament.name} has started!',
                 colour=discord.Colour.dark_blue(),
             )
             await context.send(embed=embed)
@@ -686,8 +763,8 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
         # Challonge community (subdomain) hosting the tournament
         community_name = "b5d0ca83e61253ea7f84a60c"
 
-        tournaments = challonge.tournaments.index(state='all', subdomain=community_name)
-        tournament = next((t for t in tournaments if t['name'].lower() == division_name.lower()), None)
+        # Find the tournament by its name
+        tournament = await self.catalog.get(division_name, subdomain=community_name)
 
         if tournament is None:
             embed = discord.Embed(
@@ -698,7 +775,10 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
             await context.send(embed=embed)
         else:
             # Finalize the tournament
-            challonge.tournaments.finalize(tournament['id'], subdomain=community_name)
+            await self.challonge.tournaments.finalize(tournament.id, subdomain=community_name)
+            await self.mirror.invalidate(tournament.id)
+            self.division_standings.invalidate(tournament.id)
+            self.catalog.invalidate(community_name)
 
     @tcl.command(
         name="create_season",
@@ -712,16 +792,11 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
         :param context: The command context.
         :param season_number: The season number.
         """
+        # Season operations fire bursts of Challonge calls, let player commands go first
+        set_priority(BULK)
         try:
-            # Get all users from the waitlist.
-            waitlist = await db_manager.get_waitlist()
-
-            # For each user in the waitlist, add them to the tcl_participants table.
-            for user in waitlist:
-                await db_manager.add_user_to_participants(user[0], user[1])
-
-            # Clear the waitlist for the next season.
-            await db_manager.clear_waitlist()
+            # Move every user from the waitlist to the tcl_participants table, clearing the waitlist for the next season.
+            waitlist = await db_manager.move_waitlist_to_participants()
 
             # Provided division names
             division_names = ["Fire Bomb", "Domination", "Rampage", "Life Drain", "Deception", "Command", "Elven Curse", "Death Touch"]
@@ -774,31 +849,44 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
         :param context: The command context.
         :param season: The season number.
         """
-        # Get all users from the waitlist.
-        waitlist = await db_manager.get_waitlist()
-
-        # For each user in the waitlist, add them to the tcl_participants table.
-        for user in waitlist:
-            await db_manager.add_user_to_participants(user[0], user[1])
+        # Season operations fire bursts of Challonge calls, let player commands go first
+        set_priority(BULK)
 
-        # Clear the waitlist for the next season.
-        await db_manager.clear_waitlist()
+        # Move every user from the waitlist to the tcl_participants table, clearing the waitlist for the next season.
+        await db_manager.move_waitlist_to_participants()
 
         # Challonge community (subdomain) hosting the tournament
         community_name = "b5d0ca83e61253ea7f84a60c"
 
-        # Get the list of all tournaments
-        tournaments = challonge.tournaments.index(state='all', subdomain=community_name)
+        # Get the list of pending tournaments. Divisions that were already started (e.g. by an earlier, partially
+        # failed run) are left alone
+        tournaments = await self.catalog.list(subdomain=community_name, state='pending')
 
-        # Find all tournaments that start with 'S{season}'
-        season_tournaments = [t for t in tournaments if t['name'].lower().startswith(f's{season}')]
+        # Find all pending tournaments that start with 'S{season}'
+        pending_divisions = [t for t in tournaments if t.name.lower().startswith(f's{season}')]
+        if not pending_divisions:
+            embed = discord.Embed(
+                title='Error!',
+                description=f'No pending divisions found for season {season}.',
+                colour=discord.Colour.dark_red(),
+            )
+            await context.send(embed=embed)
+            return
 
-        # Start each season tournament
-        for tournament in season_tournaments:
+        async def start_division(tournament):
             # Randomize seeds before starting the tournament
-            challonge.participants.randomize(tournament['id'])
-
-            challonge.tournaments.start(tournament['id'], subdomain=community_name)
+            await self.challonge.participants.randomize(tournament.id)
+            await self.challonge.tournaments.start(tournament.id, subdomain=community_name)
+            await self.mirror.invalidate(tournament.id)
+            self.division_standings.invalidate(tournament.id)
+
+        # Start every division at once
+        _, failures = await self._for_each_division(context, pending_divisions, start_division, "Starting")
+        self.catalog.invalidate(community_name)
+        if failures:
+            # Announce the season once every division is running, the command can simply be run again
+            await context.send(f"Season {season} was not announced, run this command again to retry the failed divisions.")
+            return
 
         # Mention the "Thandar Combat League" role
         role = discord.utils.get(context.guild.roles, id=1088139361217945688)
@@ -815,7 +903,7 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
                 f"**Season {season} of Thandar Combat League has started!**\n\n"
                 f"Thank you all so much for participating! I have done a major overhaul on the backend/organizational side of things in order to use the Hero-Helper Bot to track and record everything.  The match reporting/tracking process will now happen in discord using bot commands. *These commands will only work in your specific division channels!*\n\n"
                 f"`/tcl report` -This command will report an open match result. You will need to enter the round number, winner's name, and the number of games that were won by the winner of the match. Either player can report results and once reported duplicate reports will not mess things up.\n\n"
-                f"`/tcl standings` - This command will post the current division standings, listing players from first to last using win percentage as the primary metric. Match wins are the first tiebreaker.  I have not coded in the final head-to-head tie-breaker yet so the command will not take that into account and will randomly list players who are tied.\n\n"
+                f"`/tcl standings` - This command will post the current division standings, listing players from first to last using win percentage as the primary metric. Match wins are the first tiebreaker, followed by head-to-head results between the tied players and then game differential.\n\n"
                 f"If you are not familiar with discord bot commands, I made some tutorial videos for the Hero-Helper Bot that you can check out:\n"
                 f"Introduction to Hero-Helper Bot: [link here]\n"
                 f"Thandar Combat League with Hero-Helper Bot: [link here]\n\n"
@@ -841,14 +929,17 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
         :param context: The hybrid command context.
         :param season: The season number.
         """
+        # Season operations fire bursts of Challonge calls, let player commands go first
+        set_priority(BULK)
+
         # Challonge community (subdomain) hosting the tournament
         community_name = "b5d0ca83e61253ea7f84a60c"
 
         # Get the list of all tournaments
-        tournaments = challonge.tournaments.index(state='all', subdomain=community_name)
+        tournaments = await self.catalog.list(subdomain=community_name)
 
         # Find all tournaments that belong to the specified season
-        season_tournaments = [t for t in tournaments if t['name'].lower().startswith(f's{season}')]
+        season_tournaments = [t for t in tournaments if t.name.lower().startswith(f's{season}')]
 
         if not season_tournaments:
             embed = discord.Embed(
@@ -859,32 +950,98 @@ class Tcl(commands.Cog, name="Thandar Combat League"):
             await context.send(embed=embed)
             return
 
-        for tournament in season_tournaments:
-            # Finalize each tournament
-            challonge.tournaments.finalize(tournament['id'], subdomain=community_name)
-
-            # Mention the "Thandar Combat League" role
-            role = discord.utils.get(context.guild.roles, id=1088139361217945688)
-            # Get the channel ID of the specific channel you want to send the message to
-            channel_id = 994709202914267297
-
-            # Obtain the channel object using the channel ID
-            channel = context.guild.get_channel(channel_id)
-
-            if channel:
-                # Send the message to the specific channel
-                await channel.send(
-                    f"{role.mention}\n"
-                    f"**Season {season} of Thandar Combat League has ended!**\n\n"
-                    f"Thank you all so much for participating!\n\n"
-                    f"You can use the `/tcl standings` command in your division channel to see how everyone ranked.\n"
-                    f"This command will post the current division standings, listing players from first to last using win percentage as the primary metric. Match wins are the first tiebreaker.  *I have not coded in the final head-to-head tie-breaker yet so the command will not take that into account and will randomly list players who are tied.*\n\n"
-                    f"Promotions/Demotions will be posted soon."
-                )
-                await context.send("Season announcement sent!")
-            else:
-                # Channel not found, send an error message
-                await context.send("The specified channel was not found.")
+        async def end_division(tournament):
+            # Finalize the division unless an earlier, partially failed run already did, then build its final standings
+            if tournament.state != 'complete':
+                await self.challonge.tournaments.finalize(tournament.id, subdomain=community_name)
+                await self.mirror.invalidate(tournament.id)
+                self.division_standings.invalidate(tournament.id)
+            return await self._get_division_standings(tournament.id, community_name)
+
+        # Finalize every division at once
+        divisions, failures = await self._for_each_division(context, season_tournaments, end_division, "Finalizing")
+        self.catalog.invalidate(community_name)
+        if failures:
+            # Announce the final standings once every division is finalized, the command can simply be run again
+            await context.send(f"Season {season} was not announced, run this command again to retry the failed divisions.")
+            return
+
+        # Build the final standings of every division, tiebreaks included
+        final_standings = discord.Embed(
+            title=f"Season {season} Final Standings",
+            colour=discord.Colour.dark_green(),
+        )
+        for tournament in sorted(season_tournaments, key=lambda t: t.name):
+            division = divisions[tournament.id]
+            final_standings.add_field(
+                name=tournament.name.title(),
+                value='\n'.join(
+                    f"{place}. {player['name']} ({player['wins']}-{player['losses']}, {player['win_percentage']}%)"
+                    for place, player in enumerate(division.table(), start=1)
+                ) or "No players.",
+                inline=False,
+            )
+
+        # Mention the "Thandar Combat League" role
+        role = discord.utils.get(context.guild.roles, id=1088139361217945688)
+        # Get the channel ID of the specific channel you want to send the message to
+        channel_id = 994709202914267297
+
+        # Obtain the channel object using the channel ID
+        channel = context.guild.get_channel(channel_id)
+
+        if channel:
+            # Send the message to the specific channel
+            await channel.send(
+                f"{role.mention}\n"
+                f"**Season {season} of Thandar Combat League has ended!**\n\n"
+                f"Thank you all so much for participating!\n\n"
+                f"The final standings of every division are below, and you can use the `/tcl standings` command in your division channel to see them again.\n"
+                f"Players are listed from first to last using win percentage as the primary metric. Match wins are the first tiebreaker, followed by head-to-head results between the tied players and then game differential.\n\n"
+                f"Promotions/Demotions will be posted soon.",
+                embed=final_standings,
+            )
+            await context.send("Season announcement sent!")
+        else:
+            # Channel not found, send an error message
+            await context.send("The specified channel was not found.")
+
+    # Autocomplete handlers, served from the cached tournament catalog and mirror without calling Challonge
+    @add_players.autocomplete("division_name")
+    async def pending_division_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
+        return choices(self.catalog.complete(current, subdomain="b5d0ca83e61253ea7f84a60c", state='pending'))
+
+    @show_division.autocomplete("division_name")
+    @show_matches.autocomplete("division_name")
+    @start_division.autocomplete("division_name")
+    @end_division.autocomplete("division_name")
+    async def division_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
+        return choices(self.catalog.complete(current, subdomain="b5d0ca83e61253ea7f84a60c"))
+
+    @report.autocomplete("winner_name")
+    async def winner_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
+        # Reports are made in the division's channel, like the report command itself assumes
+        tournament = self.catalog.peek(interaction.channel.name, subdomain="b5d0ca83e61253ea7f84a60c")
+        if tournament is None:
+            return []
+        return choices(await self.mirror.complete_participant(tournament.id, current))
+
+
+def _progress_embed(action: str, divisions: list, results: dict, failures: list) -> discord.Embed:
+    # Progress of a season-wide command: gold while running, blue once every division succeeded, red on failures
+    description = f"{len(results)} of {len(divisions)} done."
+    if failures:
+        description += f" {len(failures)} failed."
+        colour = discord.Colour.dark_red()
+    elif len(results) == len(divisions):
+        colour = discord.Colour.dark_blue()
+    else:
+        colour = discord.Colour.dark_gold()
+
+    embed = discord.Embed(title=f"{action} {len(divisions)} division(s)", description=description, colour=colour)
+    for name, error in failures:
+        embed.add_field(name=name.title(), value=f"Failed: {error}", inline=False)
+    return embed
 
 
 async def setup(bot):
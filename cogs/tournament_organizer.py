@@ -1,20 +1,22 @@
-import challonge
 import discord
 import time
 import re
 from discord.ext import commands
 from discord.ext.commands import Context
 
+from helpers.models import Roster
+from helpers.name_index import choices
+
 
 # Define the Quickfire class, which is a subclass of commands.Cog
 class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
     def __init__(self, bot):
         self.bot = bot
 
-        # Set Challonge API credentials
-        key = self.bot.config["CHALLONGE_KEY"]
-        user = self.bot.config["CHALLONGE_USER"]
-        challonge.set_credentials(user, key)
+        # Shared asynchronous Challonge client, tournament catalog and local mirror of Challonge data
+        self.challonge = bot.challonge
+        self.catalog = bot.catalog
+        self.mirror = bot.mirror
 
     @commands.hybrid_group(
         name="to",
@@ -77,10 +79,11 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
         unique_url = f"{tournament_name}{int(time.time())}"
         # Remove spaces and special characters
         unique_url = re.sub('[^A-Za-z0-9]+', '', unique_url)
-        new_tournament = challonge.tournaments.create(new_tournament_name,
-                                                      url=unique_url,
-                                                      tournament_type=tournament_type,
-                                                      game_name="Hero Realms Digital")
+        new_tournament = await self.challonge.tournaments.create(new_tournament_name,
+                                                                 url=unique_url,
+                                                                 tournament_type=tournament_type,
+                                                                 game_name="Hero Realms Digital")
+        self.catalog.invalidate()
         embed = discord.Embed(
             title="Tournament Created",
             description=f"Name: {new_tournament_name}\nURL: {unique_url}\nGame: Hero Realms Digital",
@@ -104,8 +107,8 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
         :param context: The hybrid command context.
         :param tournament_name: Tournament name.
         """
-        tournaments = challonge.tournaments.index(state='all')
-        tournament = next((t for t in tournaments if t['name'].lower() == tournament_name.lower()), None)
+        # Find the tournament by its name
+        tournament = await self.catalog.get(tournament_name)
         if tournament is None:
             embed = discord.Embed(
                 title='Error',
@@ -114,10 +117,12 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
             )
             await context.send(embed=embed)
         else:
-            challonge.tournaments.destroy(tournament['id'])
+            await self.challonge.tournaments.destroy(tournament.id)
+            await self.mirror.remove_tournament(tournament.id)
+            self.catalog.invalidate()
             embed = discord.Embed(
                 title='Tournament Removed',
-                description=f'{tournament["name"]} has been removed from active tournaments.',
+                description=f'{tournament.name} has been removed from active tournaments.',
                 colour=discord.Colour.dark_blue(),
             )
             await context.send(embed=embed)
@@ -155,11 +160,8 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
             # Fetch the quickfire role
             announcement_role = discord.utils.get(context.guild.roles, name="Hero Realms Premier Circuit")
 
-        # Get the list of all tournaments
-        tournaments = challonge.tournaments.index(state='all')
-
         # Find the tournament by its name
-        tournament = next((t for t in tournaments if t['name'].lower() == tournament_name.lower()), None)
+        tournament = await self.catalog.get(tournament_name)
 
         if tournament is None:
             embed = discord.Embed(
@@ -170,12 +172,14 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
             await context.send(embed=embed)
         else:
             # Randomize seeds before starting the tournament
-            challonge.participants.randomize(tournament['id'])
+            await self.challonge.participants.randomize(tournament.id)
 
-            challonge.tournaments.start(tournament['id'])
+            await self.challonge.tournaments.start(tournament.id)
+            await self.mirror.invalidate(tournament.id)
+            self.catalog.invalidate()
             embed = discord.Embed(
                 title="Tournament Started",
-                description=f'{announcement_role.mention}, {tournament["name"]} has been started',
+                description=f'{announcement_role.mention}, {tournament.name} has been started',
                 colour=discord.Colour.dark_gold(),
             )
             await context.send(embed=embed)
@@ -193,8 +197,8 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
         :param context: The hybrid command context.
         :param tournament_name: Tournament name.
         """
-        tournaments = challonge.tournaments.index(state='all')
-        tournament = next((t for t in tournaments if t['name'].lower() == tournament_name.lower()), None)
+        # Find the tournament by its name
+        tournament = await self.catalog.get(tournament_name)
 
         if tournament is None:
             embed = discord.Embed(
@@ -205,7 +209,9 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
             await context.send(embed=embed)
         else:
             # Reset the tournament
-            challonge.tournaments.reset(tournament['id'])
+            await self.challonge.tournaments.reset(tournament.id)
+            await self.mirror.invalidate(tournament.id)
+            self.catalog.invalidate()
             embed = discord.Embed(
                 title='Tournament Reset',
                 description=f'{tournament_name} has been reset.',
@@ -227,11 +233,8 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
         :param tournament_name: Name of the tournament.
         :param player_name: Discord name of player to add.
         """
-        # Get the list of all tournaments
-        tournaments = challonge.tournaments.index(state='all')
-
         # Find the tournament by its name
-        tournament = next((t for t in tournaments if t['name'].lower() == tournament_name.lower()), None)
+        tournament = await self.catalog.get(tournament_name)
 
         if tournament is None:
             embed = discord.Embed(
@@ -242,10 +245,12 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
             await context.send(embed=embed)
         else:
             # If the tournament exists, add the participant.
-            participant = challonge.participants.create(tournament['id'], player_name)
+            participant = await self.challonge.participants.create(tournament.id, player_name)
+            await self.mirror.put_participant(tournament.id, participant)
+            self.bot.admission.forget(tournament.id)
             embed = discord.Embed(
                 title="Participant Added",
-                description=f'Participant {participant["name"]} added to tournament {tournament["name"]}',
+                description=f'Participant {participant["name"]} added to tournament {tournament.name}',
                 colour=discord.Colour.dark_green(),
             )
             await context.send(embed=embed)
@@ -264,8 +269,8 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
         :param tournament_name: Tournament player_name.
         :param name: Name of the player to remove.
         """
-        tournaments = challonge.tournaments.index(state='all')
-        tournament = next((t for t in tournaments if t['name'].lower() == tournament_name.lower()), None)
+        # Find the tournament by its name
+        tournament = await self.catalog.get(tournament_name)
 
         if tournament is None:
             embed = discord.Embed(
@@ -276,10 +281,10 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
             await context.send(embed=embed)
         else:
             # Get participants
-            participants = challonge.participants.index(tournament['id'])
+            roster = Roster.from_api(await self.challonge.participants.index(tournament.id))
 
             # Find the player in the list of participants
-            player_participant = next((p for p in participants if p["name"].lower() == name.lower()), None)
+            player_participant = roster.by_name.get(name.lower())
 
             if player_participant is None:
                 embed = discord.Embed(
@@ -290,7 +295,9 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
                 await context.send(embed=embed)
             else:
                 # Remove the player from the tournament
-                challonge.participants.destroy(tournament['id'], player_participant['id'])
+                await self.challonge.participants.destroy(tournament.id, player_participant.id)
+                await self.mirror.remove_participant(tournament.id, player_participant.id)
+                self.bot.admission.forget(tournament.id)
                 await context.send(f'Player "{name}" has been removed from tournament "{tournament_name}"')
                 embed = discord.Embed(
                     title='Removed.',
@@ -331,8 +338,8 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
             # Fetch the quickfire role
             announcement_role = discord.utils.get(context.guild.roles, name="Hero Realms Premier Circuit")
 
-        tournaments = challonge.tournaments.index(state='all')
-        tournament = next((t for t in tournaments if t['name'].lower() == tournament_name.lower()), None)
+        # Find the tournament by its name
+        tournament = await self.catalog.get(tournament_name)
 
         if tournament is None:
             embed = discord.Embed(
@@ -343,23 +350,25 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
             await context.send(embed=embed)
         else:
             # Finalize the tournament
-            challonge.tournaments.finalize(tournament['id'])
+            await self.challonge.tournaments.finalize(tournament.id)
+            await self.mirror.invalidate(tournament.id)
+            self.catalog.invalidate()
 
             # Refresh tournament data
-            tournament = challonge.tournaments.show(tournament['id'])
+            details = await self.challonge.tournaments.show(tournament.id)
 
-            if tournament['state'] == 'complete':
+            if details['state'] == 'complete':
                 # Get participants
-                participants = challonge.participants.index(tournament['id'])
+                roster = Roster.from_api(await self.challonge.participants.index(tournament.id))
 
                 # Find the winner in the list of participants
-                winner_id = tournament['winner_id']
-                winner_participant = next((p for p in participants if p["id"] == winner_id), None)
+                winner_id = details['winner_id']
+                winner_participant = roster.by_id.get(winner_id)
 
                 # Create an embed with the winner's information
                 embed = discord.Embed(
                     title=f'Tournament "{tournament_name}" is complete!',
-                    description=f'Congratulations to the winner: {winner_participant["name"]}\n{announcement_role.mention}',
+                    description=f'Congratulations to the winner: {winner_participant.name}\n{announcement_role.mention}',
                     colour=discord.Colour.dark_gold(),
                 )
                 await context.send(embed=embed)
@@ -371,6 +380,24 @@ class TournamentOrganizer(commands.Cog, name="Tournament Organizer"):
                 )
                 await context.send(embed=embed)
 
+    # Autocomplete handlers, served from the cached tournament catalog and mirror without calling Challonge
+    @remove_tournament.autocomplete("tournament_name")
+    @start_tournament.autocomplete("tournament_name")
+    @reset_tournament.autocomplete("tournament_name")
+    @add_player.autocomplete("tournament_name")
+    @remove_player.autocomplete("tournament_name")
+    @finalize.autocomplete("tournament_name")
+    async def tournament_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
+        return choices(self.catalog.complete(current))
+
+    @remove_player.autocomplete("name")
+    async def player_autocomplete(self, interaction: discord.Interaction, current: str) -> list:
+        tournament_name = interaction.namespace.tournament_name
+        tournament = self.catalog.peek(tournament_name) if tournament_name else None
+        if tournament is None:
+            return []
+        return choices(await self.mirror.complete_participant(tournament.id, current))
+
 
 # Define the setup function, which adds the Quickfire cog to the Hero-Helper Bot
 async def setup(bot):
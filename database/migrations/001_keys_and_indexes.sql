@@ -0,0 +1,21 @@
+-- One waitlist entry per user, and case-insensitive in game names in both tables.
+CREATE TABLE `waitlist_new` (
+  `user_id` varchar(20) NOT NULL PRIMARY KEY,
+  `hr_ign` varchar(20) NOT NULL COLLATE NOCASE,
+  `created_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+INSERT OR IGNORE INTO `waitlist_new` (`user_id`, `hr_ign`, `created_at`)
+  SELECT `user_id`, `hr_ign`, `created_at` FROM `waitlist` ORDER BY `created_at`;
+DROP TABLE `waitlist`;
+ALTER TABLE `waitlist_new` RENAME TO `waitlist`;
+
+CREATE TABLE `tcl_participants_new` (
+    `user_id` varchar(20) NOT NULL PRIMARY KEY,
+    `hr_ign` varchar(20) NOT NULL COLLATE NOCASE
+);
+INSERT OR IGNORE INTO `tcl_participants_new` (`user_id`, `hr_ign`)
+  SELECT `user_id`, `hr_ign` FROM `tcl_participants`;
+DROP TABLE `tcl_participants`;
+ALTER TABLE `tcl_participants_new` RENAME TO `tcl_participants`;
+
+CREATE INDEX `tcl_participants_hr_ign` ON `tcl_participants` (`hr_ign` COLLATE NOCASE);
@@ -0,0 +1,30 @@
+-- Local mirror of Challonge tournaments, participants and matches. Every row keeps the raw API object in `data`,
+-- the other columns only exist to look rows up.
+CREATE TABLE `challonge_tournaments` (
+  `id` integer NOT NULL PRIMARY KEY,
+  `subdomain` varchar(64),
+  `name` varchar(60) NOT NULL COLLATE NOCASE,
+  `state` varchar(32) NOT NULL,
+  `updated_at` varchar(32),
+  -- The tournament's updated_at when its participants and matches were last fetched, NULL if they never were.
+  `synced_version` varchar(32),
+  `data` text NOT NULL
+);
+CREATE INDEX `challonge_tournaments_subdomain` ON `challonge_tournaments` (`subdomain`, `state`);
+
+CREATE TABLE `challonge_participants` (
+  `id` integer NOT NULL PRIMARY KEY,
+  `tournament_id` integer NOT NULL,
+  `position` integer NOT NULL,
+  `data` text NOT NULL
+);
+CREATE INDEX `challonge_participants_tournament` ON `challonge_participants` (`tournament_id`, `position`);
+
+CREATE TABLE `challonge_matches` (
+  `id` integer NOT NULL PRIMARY KEY,
+  `tournament_id` integer NOT NULL,
+  `state` varchar(32) NOT NULL,
+  `position` integer NOT NULL,
+  `data` text NOT NULL
+);
+CREATE INDEX `challonge_matches_tournament` ON `challonge_matches` (`tournament_id`, `state`, `position`);
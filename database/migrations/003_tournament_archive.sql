@@ -0,0 +1,5 @@
+-- Completed tournaments stay in the mirror as a local archive. The creation time of the newest archived tournament
+-- is the watermark for only fetching tournaments that ended since.
+ALTER TABLE `challonge_tournaments` ADD COLUMN `created_at` varchar(32);
+UPDATE `challonge_tournaments` SET `created_at` = json_extract(`data`, '$.created_at');
+CREATE INDEX `challonge_tournaments_created_at` ON `challonge_tournaments` (`subdomain`, `created_at`);
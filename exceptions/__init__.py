@@ -19,3 +19,15 @@ class UserNotOwner(commands.CheckFailure):
     def __init__(self, message="User is not an owner of the bot!"):
         self.message = message
         super().__init__(self.message)
+
+
+class ChallongeError(Exception):
+    """
+    Thrown when the Challonge API rejects a request or cannot be reached.
+    """
+
+    def __init__(self, *errors, status: int = None):
+        self.errors = errors or ("Challonge request failed!",)
+        self.status = status
+        self.message = " ".join(str(error) for error in self.errors)
+        super().__init__(self.message)
@@ -0,0 +1,87 @@
+import asyncio
+
+# Outcomes of a signup
+ADMITTED = "admitted"
+DUPLICATE = "duplicate"
+FULL = "full"
+
+
+class _Roster:
+    def __init__(self, names: list, capacity: int):
+        self.names = {name.lower() for name in names}
+        self.reserved = set()
+        self.capacity = capacity
+        self.filled = False
+
+
+class AdmissionController:
+    """
+    Admits signups to capped tournaments (e.g. 16-player Quickfire events) from a cached roster.
+
+    The roster of each tournament is loaded once from the mirror. A signup is checked against it and reserves its
+    seat without awaiting anything, which is atomic on the event loop, so concurrent signups can neither overshoot
+    the cap nor register the same name twice. Exactly one signup is told that it filled the tournament.
+    """
+
+    def __init__(self, mirror, capacity: int = 16):
+        self.mirror = mirror
+        self.capacity = capacity
+        self._rosters = {}
+        self._locks = {}
+
+    async def admit(self, tournament_id: int, name: str, create) -> tuple:
+        """
+        Signs a player up if the tournament has room and the name is not taken.
+
+        :param tournament_id: The Challonge tournament ID.
+        :param name: The participant name.
+        :param create: A coroutine function that creates the participant on Challonge and returns it.
+        :return: The outcome (ADMITTED, DUPLICATE or FULL), the created participant (or None) and whether this
+            signup filled the tournament, in which case the caller starts it.
+        """
+        roster = await self._roster(tournament_id)
+        key = name.lower()
+        if key in roster.names or key in roster.reserved:
+            return DUPLICATE, None, False
+        if len(roster.names) >= roster.capacity and not roster.filled:
+            # The tournament was already full when its roster was loaded, but never started
+            roster.filled = True
+            return FULL, None, True
+        if roster.filled or len(roster.names) + len(roster.reserved) >= roster.capacity:
+            return FULL, None, False
+
+        roster.reserved.add(key)
+        try:
+            participant = await create()
+        finally:
+            # A failed signup gives its seat back
+            roster.reserved.discard(key)
+        roster.names.add(key)
+
+        fills = not roster.filled and len(roster.names) >= roster.capacity
+        if fills:
+            roster.filled = True
+        return ADMITTED, participant, fills
+
+    def forget(self, tournament_id: int):
+        """
+        Drops the cached roster of a tournament, e.g. after its participants were changed by other commands.
+
+        :param tournament_id: The Challonge tournament ID.
+        """
+        self._rosters.pop(tournament_id, None)
+
+    async def _roster(self, tournament_id: int) -> _Roster:
+        roster = self._rosters.get(tournament_id)
+        if roster is not None:
+            return roster
+
+        # Only the first signup loads the roster, the others wait for it.
+        lock = self._locks.setdefault(tournament_id, asyncio.Lock())
+        async with lock:
+            roster = self._rosters.get(tournament_id)
+            if roster is None:
+                participants = await self.mirror.participants(tournament_id)
+                roster = _Roster([p.name for p in participants], self.capacity)
+                self._rosters[tournament_id] = roster
+        return roster
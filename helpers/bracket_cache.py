@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+
+
+class BracketCache:
+    """
+    Caches the rendered bracket image of each tournament, together with the tournament versions it is valid for.
+
+    An image is stored under the version of the data it was drawn from, and also under the version the caller had
+    when it asked for the render, which may be older. After a report, the catalog still holds the previous
+    ``updated_at`` until the mirror's next poll, so both the lookups made before that poll and the ones made after
+    it find the same image.
+
+    Images are kept in a least-recently-used in-memory cache bounded by total size in bytes. If ``directory`` is
+    given, images are also written to disk so that they survive a restart and can be served after eviction.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, directory: str = None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._generations = {}
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    async def get(self, tournament_id: int, version: str):
+        """
+        Returns the cached image for a tournament version.
+
+        :param tournament_id: The Challonge tournament ID.
+        :param version: The tournament version, e.g. Challonge's ``updated_at``.
+        :return: The image bytes, or None if the image is not cached.
+        """
+        entry = self._images.get(tournament_id)
+        if entry is not None and str(version) in entry[0]:
+            self._images.move_to_end(tournament_id)
+            self.hits += 1
+            return entry[1]
+
+        if self.directory is not None and entry is None:
+            # Only the version an image was drawn from is written to disk.
+            image = await asyncio.to_thread(_read, self._path(tournament_id, version))
+            if image is not None:
+                self._store(tournament_id, {str(version)}, image)
+                self.hits += 1
+                return image
+
+        self.misses += 1
+        return None
+
+    def generation(self, tournament_id: int) -> int:
+        """
+        Returns a counter that changes every time the tournament is invalidated.
+
+        Take it before rendering and pass it to :meth:`put`, so an image rendered from data that was invalidated
+        while the render was running is not cached.
+
+        :param tournament_id: The Challonge tournament ID.
+        """
+        return self._generations.get(tournament_id, 0)
+
+    async def put(self, tournament_id: int, version: str, image: bytes, generation: int = None,
+                  aliases: tuple = ()):
+        """
+        Caches the image of a tournament, replacing its previous image.
+
+        :param tournament_id: The Challonge tournament ID.
+        :param version: The version of the data the image was drawn from, e.g. Challonge's ``updated_at``.
+        :param image: The image bytes.
+        :param generation: The value of :meth:`generation` when rendering started.
+        :param aliases: Older versions the image also stands for, e.g. the version the caller asked for.
+        """
+        if generation is not None and generation != self.generation(tournament_id):
+            return
+        self._drop(tournament_id)
+        self._store(tournament_id, {str(version), *map(str, aliases)}, image)
+        if self.directory is not None:
+            await asyncio.to_thread(_replace, self.directory, tournament_id, self._path(tournament_id, version), image)
+
+    async def invalidate(self, tournament_id: int):
+        """
+        Drops every cached image of a tournament, in memory and on disk.
+
+        :param tournament_id: The Challonge tournament ID.
+        """
+        self._generations[tournament_id] = self.generation(tournament_id) + 1
+        self._drop(tournament_id)
+        if self.directory is not None:
+            await asyncio.to_thread(_remove_tournament, self.directory, tournament_id)
+
+    def _drop(self, tournament_id: int):
+        entry = self._images.pop(tournament_id, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    def _store(self, tournament_id: int, versions: set, image: bytes):
+        if len(image) > self.max_bytes:
+            return
+        previous = self._images.pop(tournament_id, None)
+        if previous is not None:
+            self.size -= len(previous[1])
+        self._images[tournament_id] = (frozenset(versions), image)
+        self.size += len(image)
+        # Evict the least recently used images until the cache fits its byte budget.
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self._images.popitem(last=False)
+            self.size -= len(evicted)
+
+    def _path(self, tournament_id: int, version: str) -> str:
+        digest = hashlib.sha1(str(version).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{tournament_id}-{digest}.png")
+
+
+def _read(path: str):
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write(path: str, image: bytes):
+    # Write to a temporary file first so that a concurrent reader never sees a partial image.
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(image)
+    os.replace(temporary_path, path)
+
+
+def _replace(directory: str, tournament_id: int, path: str, image: bytes):
+    _remove_tournament(directory, tournament_id, keep=path)
+    _write(path, image)
+
+
+def _remove_tournament(directory: str, tournament_id: int, keep: str = None):
+    prefix = f"{tournament_id}-"
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.startswith(prefix) and path != keep:
+            _remove(path)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,343 @@
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw, ImageFont
+
+from helpers.models import Tournament
+from helpers.rate_limiter import BACKGROUND, INTERACTIVE, set_priority
+
+# Tournament types that can be drawn natively, anything else falls back to a browser screenshot.
+SUPPORTED_TYPES = {"single elimination", "double elimination", "round robin"}
+
+BACKGROUND_COLOUR = (47, 49, 54)
+BOX = (64, 68, 75)
+BOX_WINNER = (59, 130, 86)
+TEXT = (220, 221, 222)
+TEXT_MUTED = (142, 146, 151)
+LINE = (114, 118, 125)
+
+
+def resolution_for(participants_count: int) -> tuple:
+    """
+    Returns the image resolution used for a bracket with the given number of participants.
+
+    :param participants_count: The number of participants in the tournament.
+    :return: The (width, height) of the image.
+    """
+    if participants_count <= 16:
+        return 1000, 650
+    elif participants_count <= 32:
+        return 1300, 1050
+    return 2000, 2000
+
+
+def render_bracket(tournament_type: str, participants: dict, matches: list, size: tuple) -> bytes:
+    """
+    Draws a bracket image from Challonge match data.
+
+    This is a plain function operating on plain data so that it can run in a worker process.
+
+    :param tournament_type: The Challonge tournament type.
+    :param participants: Participant names keyed by participant ID.
+    :param matches: The tournament's matches as dictionaries.
+    :param size: The (width, height) of the image.
+    :return: The image as PNG bytes.
+    """
+    image = Image.new("RGB", size, BACKGROUND_COLOUR)
+    draw = ImageDraw.Draw(image)
+    width, height = size
+
+    if tournament_type == "round robin":
+        _draw_round_robin(draw, participants, matches, (0, 0, width, height))
+    else:
+        winners = [m for m in matches if m['round'] > 0]
+        losers = [m for m in matches if m['round'] < 0]
+        if losers:
+            # Double elimination: winners bracket on top, losers bracket below.
+            split = int(height * 0.6)
+            _draw_elimination(draw, participants, winners, (0, 0, width, split))
+            draw.line((20, split, width - 20, split), fill=LINE, width=1)
+            _draw_elimination(draw, participants, losers, (0, split, width, height), losers=True)
+        else:
+            _draw_elimination(draw, participants, winners, (0, 0, width, height))
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=False)
+    return buffer.getvalue()
+
+
+def _draw_elimination(draw: ImageDraw.ImageDraw, participants: dict, matches: list, area: tuple, losers: bool = False):
+    left, top, right, bottom = area
+    rounds = sorted({abs(m['round']) for m in matches})
+    if not rounds:
+        return
+
+    by_round = {r: sorted((m for m in matches if abs(m['round']) == r), key=lambda m: m['id']) for r in rounds}
+    column_width = (right - left) / len(rounds)
+    header_height = 24
+    most_matches = max(len(round_matches) for round_matches in by_round.values())
+    box_width = column_width * 0.8
+    box_height = min((bottom - top - header_height) / most_matches * 0.8, 48)
+    font = _font(max(int(box_height / 2 * 0.6), 9))
+    header_font = _font(12)
+
+    # Place each match in the vertical centre of its slot, and remember where it was drawn for the connectors.
+    positions = {}
+    for column, round_number in enumerate(rounds):
+        round_matches = by_round[round_number]
+        x = left + column * column_width + (column_width - box_width) / 2
+        slot_height = (bottom - top - header_height) / len(round_matches)
+        if losers:
+            label = f"Losers Round {round_number}"
+        elif round_number == rounds[-1] and len(round_matches) == 1:
+            label = "Final"
+        else:
+            label = f"Round {round_number}"
+        draw.text((x, top + 6), label, fill=TEXT_MUTED, font=header_font)
+        for index, match in enumerate(round_matches):
+            y = top + header_height + index * slot_height + (slot_height - box_height) / 2
+            positions[match['id']] = (x, y)
+            _draw_match(draw, participants, match, (x, y, x + box_width, y + box_height), font)
+
+    for match in matches:
+        x, y = positions[match['id']]
+        for prerequisite in (match.get('player1_prereq_match_id'), match.get('player2_prereq_match_id')):
+            if prerequisite not in positions:
+                continue
+            px, py = positions[prerequisite]
+            if px >= x:
+                continue
+            start = (px + box_width, py + box_height / 2)
+            end = (x, y + box_height / 2)
+            middle = (start[0] + end[0]) / 2
+            draw.line((start, (middle, start[1]), (middle, end[1]), end), fill=LINE, width=1)
+
+
+def _draw_match(draw: ImageDraw.ImageDraw, participants: dict, match: dict, box: tuple, font):
+    left, top, right, bottom = box
+    row_height = (bottom - top) / 2
+    scores = _scores(match.get('scores_csv'))
+    for row, player_key in enumerate(("player1_id", "player2_id")):
+        player_id = match.get(player_key)
+        row_top = top + row * row_height
+        is_winner = player_id is not None and player_id == match.get('winner_id')
+        draw.rectangle((left, row_top, right, row_top + row_height - 1), fill=BOX_WINNER if is_winner else BOX)
+
+        name = participants.get(player_id, "TBD") if player_id is not None else "TBD"
+        score = str(scores[row]) if scores else ""
+        score_width = draw.textlength(score, font=font)
+        text_y = row_top + (row_height - font.size) / 2
+        draw.text((left + 6, text_y), _fit(draw, name, font, right - left - score_width - 18), fill=TEXT, font=font)
+        if score:
+            draw.text((right - score_width - 6, text_y), score, fill=TEXT, font=font)
+
+
+def _draw_round_robin(draw: ImageDraw.ImageDraw, participants: dict, matches: list, area: tuple):
+    left, top, right, bottom = area
+    players = list(participants)
+    if not players:
+        return
+
+    # Results keyed by (row player, column player), as "games won-games lost" for the row player.
+    results = {}
+    records = {player_id: [0, 0] for player_id in players}
+    for match in matches:
+        scores = _scores(match.get('scores_csv'))
+        player1_id, player2_id = match.get('player1_id'), match.get('player2_id')
+        if not scores or player1_id not in records or player2_id not in records:
+            continue
+        results[(player1_id, player2_id)] = f"{scores[0]}-{scores[1]}"
+        results[(player2_id, player1_id)] = f"{scores[1]}-{scores[0]}"
+        if match.get('winner_id') in records:
+            loser_id = player2_id if match['winner_id'] == player1_id else player1_id
+            records[match['winner_id']][0] += 1
+            records[loser_id][1] += 1
+
+    columns = len(players) + 1
+    name_width = (right - left) * 0.22
+    cell_width = (right - left - name_width - 20) / columns
+    cell_height = min((bottom - top - 20) / (len(players) + 1), 48)
+    font = _font(max(int(cell_height * 0.35), 9))
+    origin_x, origin_y = left + 10, top + 10
+
+    # Header row: one column per opponent, plus the match record.
+    for column, player_id in enumerate(players + [None]):
+        x = origin_x + name_width + column * cell_width
+        label = participants[player_id] if player_id is not None else "W-L"
+        draw.text((x + 4, origin_y + (cell_height - font.size) / 2), _fit(draw, label, font, cell_width - 8),
+                  fill=TEXT_MUTED, font=font)
+
+    for row, row_player in enumerate(players):
+        y = origin_y + (row + 1) * cell_height
+        draw.text((origin_x, y + (cell_height - font.size) / 2), _fit(draw, participants[row_player], font, name_width - 8),
+                  fill=TEXT, font=font)
+        for column, column_player in enumerate(players + [None]):
+            x = origin_x + name_width + column * cell_width
+            cell = (x + 1, y + 1, x + cell_width - 1, y + cell_height - 1)
+            if column_player is None:
+                text, fill = f"{records[row_player][0]}-{records[row_player][1]}", BOX
+            elif column_player == row_player:
+                text, fill = "", BACKGROUND_COLOUR
+            else:
+                text = results.get((row_player, column_player), "")
+                won = text and int(text.split('-')[0]) > int(text.split('-')[1])
+                fill = BOX_WINNER if won else BOX
+            draw.rectangle(cell, fill=fill, outline=LINE)
+            if text:
+                text_width = draw.textlength(text, font=font)
+                draw.text((x + (cell_width - text_width) / 2, y + (cell_height - font.size) / 2), text, fill=TEXT, font=font)
+
+
+def _scores(scores_csv: str):
+    if not scores_csv:
+        return None
+    try:
+        first, second = scores_csv.split(',')[0].split('-')
+        return int(first), int(second)
+    except ValueError:
+        return None
+
+
+def _fit(draw: ImageDraw.ImageDraw, text: str, font, max_width: float) -> str:
+    if draw.textlength(text, font=font) <= max_width:
+        return text
+    while text and draw.textlength(text + "…", font=font) > max_width:
+        text = text[:-1]
+    return text + "…"
+
+
+def _font(size: int):
+    return ImageFont.load_default(size=size)
+
+
+class BracketRenderer:
+    """
+    Renders Challonge brackets to images.
+
+    Single/double elimination and round robin brackets are drawn natively in a process pool. Other tournament
+    types (e.g. swiss) fall back to a screenshot of Challonge's live image taken with the browser pool.
+    """
+
+    def __init__(self, challonge, browser_pool, cache, max_workers: int = 2):
+        self.challonge = challonge
+        self.browser_pool = browser_pool
+        self.cache = cache
+        self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._in_flight = {}
+
+    async def render(self, tournament: Tournament, subdomain: str = None, background: bool = False) -> bytes:
+        """
+        Renders the bracket of a tournament.
+
+        :param tournament: The tournament, as returned by the catalog.
+        :param subdomain: The Challonge community (subdomain) hosting the tournament.
+        :param background: Whether this is a speculative pre-render rather than a player's request.
+        :return: The bracket image as PNG bytes.
+        """
+        # Repeated requests for an unchanged tournament are served from the cache.
+        version = str(tournament.updated_at)
+        image = await self.cache.get(tournament.id, version)
+        if image is not None:
+            return image
+        generation = self.cache.generation(tournament.id)
+
+        # A render of the same tournament data that is already running (e.g. a background pre-render) is shared.
+        key = (tournament.id, generation)
+        render, started_in_background = self._join(key, tournament, subdomain, version, generation, background)
+        try:
+            return await asyncio.shield(render)
+        except Exception:
+            if background or not started_in_background:
+                raise
+        # The pre-render this request joined failed, render again at interactive priority rather than report its error.
+        render, _ = self._join(key, tournament, subdomain, version, generation, False, priority=INTERACTIVE)
+        return await asyncio.shield(render)
+
+    def _join(self, key: tuple, tournament: Tournament, subdomain: str, version: str, generation: int,
+              background: bool, priority: int = None) -> tuple:
+        entry = self._in_flight.get(key)
+        if entry is not None and not entry[0].done():
+            return entry
+        render = asyncio.ensure_future(self._render(tournament, subdomain, version, generation, priority))
+        entry = self._in_flight[key] = (render, background)
+        render.add_done_callback(lambda _: self._in_flight.pop(key) if self._in_flight.get(key) is entry else None)
+        return entry
+
+    async def _render(self, tournament: Tournament, subdomain: str, version: str, generation: int,
+                      priority: int = None) -> bytes:
+        if priority is not None:
+            # The render runs in its own task, so this does not change the caller's priority.
+            set_priority(priority)
+        size = resolution_for(tournament.participants_count)
+        if tournament.tournament_type not in SUPPORTED_TYPES:
+            image = await self.browser_pool.screenshot(tournament.live_image_url, size)
+            await self.cache.put(tournament.id, version, image, generation=generation)
+            return image
+
+        details = await self.challonge.tournaments.show(tournament.id, include_participants=1,
+                                                        include_matches=1, subdomain=subdomain)
+        participants = {p['id']: p['name'] for p in details['participants']}
+        loop = asyncio.get_running_loop()
+        image = await loop.run_in_executor(self._executor, render_bracket, details['tournament_type'],
+                                           participants, details['matches'], size)
+
+        # Keyed by the version that was drawn, so lookups still hit once the catalog catches up with Challonge.
+        await self.cache.put(tournament.id, str(details['updated_at']), image, generation=generation,
+                             aliases=(version,))
+        return image
+
+    def close(self):
+        """
+        Shuts the render processes down.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BracketRenderQueue:
+    """
+    Re-renders brackets in the background after a match is reported.
+
+    Reports for the same tournament that arrive within ``delay`` seconds of each other are collapsed into a single
+    render, so a burst of reports costs one render and the next bracket command finds a fresh image in the cache.
+    """
+
+    def __init__(self, renderer: BracketRenderer, logger, delay: float = 2.0):
+        self.renderer = renderer
+        self.logger = logger
+        self.delay = delay
+        self._pending = {}
+        self._tasks = {}
+
+    def schedule(self, tournament: Tournament, subdomain: str = None):
+        """
+        Queues a re-render of a tournament's bracket.
+
+        :param tournament: The tournament, as returned by the catalog.
+        :param subdomain: The Challonge community (subdomain) hosting the tournament.
+        """
+        self._pending[tournament.id] = (tournament, subdomain)
+        if tournament.id not in self._tasks:
+            self._tasks[tournament.id] = asyncio.create_task(self._run(tournament.id))
+
+    async def _run(self, tournament_id: int):
+        # Pre-rendering is speculative, its Challonge calls wait behind player commands.
+        set_priority(BACKGROUND)
+        try:
+            # Keep going while reports keep arriving, each pass renders the latest state once.
+            while tournament_id in self._pending:
+                await asyncio.sleep(self.delay)
+                tournament, subdomain = self._pending.pop(tournament_id)
+                try:
+                    await self.renderer.render(tournament, subdomain=subdomain, background=True)
+                except Exception as e:
+                    self.logger.warning(f"Failed to pre-render the bracket of {tournament.name}: {e}")
+        finally:
+            self._tasks.pop(tournament_id, None)
+
+    def close(self):
+        """
+        Cancels every queued render.
+        """
+        for task in self._tasks.values():
+            task.cancel()
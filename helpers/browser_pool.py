@@ -0,0 +1,120 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+
+class _Browser:
+    def __init__(self, driver):
+        self.driver = driver
+        self.renders = 0
+
+    def is_healthy(self) -> bool:
+        try:
+            # Any round-trip to the browser raises if Chrome or the driver has died.
+            return bool(self.driver.window_handles)
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """
+    A size-bounded pool of warm headless Chrome instances used to screenshot Challonge brackets.
+
+    All Selenium calls run on a dedicated thread pool, so they never block the event loop. Browsers are reused
+    between renders, health-checked before use and recycled after ``max_renders`` screenshots.
+    """
+
+    def __init__(self, size: int = 2, max_renders: int = 50, page_load_timeout: float = 30.0):
+        self.size = size
+        self.max_renders = max_renders
+        self.page_load_timeout = page_load_timeout
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="bracket-browser")
+        self._semaphore = asyncio.Semaphore(size)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._driver_path = None
+
+    async def screenshot(self, url: str, window_size: tuple) -> bytes:
+        """
+        Loads a page in a pooled browser and returns a PNG screenshot of it.
+
+        :param url: The URL of the page to capture.
+        :param window_size: The (width, height) of the browser window.
+        :return: The PNG screenshot.
+        """
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._screenshot, url, window_size)
+
+    async def close(self):
+        """
+        Quits every idle browser and shuts the worker threads down.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._quit_idle)
+        self._executor.shutdown(wait=False)
+
+    def _screenshot(self, url: str, window_size: tuple) -> bytes:
+        browser = self._acquire()
+        try:
+            browser.driver.set_window_size(*window_size)
+            browser.driver.get(url)
+            screenshot = browser.driver.get_screenshot_as_png()
+        except Exception:
+            # A browser that failed mid-render is not trusted again.
+            browser.quit()
+            raise
+        browser.renders += 1
+        self._release(browser)
+        return screenshot
+
+    def _acquire(self) -> _Browser:
+        while True:
+            with self._lock:
+                browser = self._idle.pop() if self._idle else None
+            if browser is None:
+                return self._launch()
+            if browser.is_healthy():
+                return browser
+            browser.quit()
+
+    def _release(self, browser: _Browser):
+        if browser.renders >= self.max_renders:
+            browser.quit()
+            return
+        with self._lock:
+            self._idle.append(browser)
+
+    def _launch(self) -> _Browser:
+        with self._lock:
+            # Resolve the driver binary once instead of on every launch.
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+            driver_path = self._driver_path
+
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-infobars")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-gpu")
+        driver = webdriver.Chrome(service=Service(driver_path), options=options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        return _Browser(driver)
+
+    def _quit_idle(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for browser in idle:
+            browser.quit()
@@ -0,0 +1,252 @@
+import asyncio
+import copy
+import json
+
+import aiohttp
+
+from exceptions import ChallongeError
+from helpers.rate_limiter import RateLimiter
+
+CHALLONGE_API_URL = "https://api.challonge.com/v1"
+USER_AGENT = "hero-helper-bot"
+
+
+class ChallongeClient:
+    """
+    Asynchronous Challonge API client.
+
+    All requests share a single pooled aiohttp session, so cogs can await Challonge calls without blocking the
+    event loop. The resource namespaces mirror pychallonge (``client.tournaments.index(...)`` and so on).
+    Every request first waits on the shared rate limiter, in the priority lane of the calling task, and identical
+    concurrent reads are coalesced into a single request.
+    """
+
+    def __init__(self, user: str, api_key: str, timeout: float = 30.0, max_connections: int = 10,
+                 rate_limiter: RateLimiter = None):
+        self.auth = aiohttp.BasicAuth(user, api_key)
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_connections = max_connections
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.request_count = 0
+        self.coalesced_count = 0
+        self._session = None
+        self._in_flight = {}
+
+        self.tournaments = Tournaments(self)
+        self.participants = Participants(self)
+        self.matches = Matches(self)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # The session is created lazily so that it is bound to the event loop the bot is running on.
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                auth=self.auth,
+                timeout=self.timeout,
+                headers={"User-Agent": USER_AGENT},
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+            )
+        return self._session
+
+    async def close(self):
+        """
+        Closes the pooled HTTP session.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def fetch(self, method: str, uri: str, params_prefix: str = None, **params):
+        """
+        Sends a request to the Challonge API and returns the parsed JSON response.
+
+        :param method: The HTTP method.
+        :param uri: The API path without the ``.json`` suffix, e.g. ``tournaments/123/matches``.
+        :param params_prefix: Optional prefix used to wrap parameters, e.g. ``tournament`` -> ``tournament[name]``.
+        :return: The response with Challonge's ``{"tournament": {...}}`` wrappers removed.
+        :raises ChallongeError: If Challonge rejects the request or cannot be reached.
+        """
+        prepared = _prepare_params(params, params_prefix)
+        if method in ("POST", "PUT"):
+            request_data = {"data": prepared}
+        else:
+            request_data = {"params": prepared}
+
+        if method != "GET":
+            try:
+                return await self._request(method, uri, request_data)
+            finally:
+                # Reads started before this write may return the old state, later reads must not join them.
+                self._in_flight.clear()
+
+        # Identical reads that overlap share one HTTP call. The caller that started it gets the parsed response,
+        # the others get copies so that no caller sees another one's changes.
+        key = (uri, tuple(prepared))
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.coalesced_count += 1
+            return copy.deepcopy(await asyncio.shield(in_flight))
+
+        in_flight = asyncio.ensure_future(self._request(method, uri, request_data))
+        self._in_flight[key] = in_flight
+        in_flight.add_done_callback(lambda task: self._forget(key, task))
+        return await asyncio.shield(in_flight)
+
+    def _forget(self, key: tuple, task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the error as retrieved in case every caller was cancelled while waiting.
+            task.exception()
+
+    async def _request(self, method: str, uri: str, request_data: dict):
+        await self.rate_limiter.acquire()
+        session = self._get_session()
+        self.request_count += 1
+        try:
+            async with session.request(method, f"{CHALLONGE_API_URL}/{uri}.json", **request_data) as response:
+                if response.status == 422:
+                    # Application-level errors are returned as a list of messages.
+                    document = await response.json(content_type=None)
+                    raise ChallongeError(*document.get("errors", ["Unprocessable request."]), status=response.status)
+                if response.status >= 400:
+                    raise ChallongeError(f"Challonge returned HTTP {response.status} for {method} {uri}.",
+                                         status=response.status)
+                text = await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Connection failures and timeouts surface as the same error type as rejected requests.
+            raise ChallongeError(f"Could not reach Challonge for {method} {uri}: {str(e) or type(e).__name__}") from e
+
+        if not text.strip():
+            return []
+        return _parse(json.loads(text))
+
+
+class Tournaments:
+    def __init__(self, client: ChallongeClient):
+        self.client = client
+
+    async def index(self, **params):
+        """Retrieve a set of tournaments created with your account."""
+        return await self.client.fetch("GET", "tournaments", **params)
+
+    async def create(self, name: str, url: str, tournament_type: str = "single elimination", **params):
+        """Create a new tournament."""
+        params.update({"name": name, "url": url, "tournament_type": tournament_type})
+        return await self.client.fetch("POST", "tournaments", "tournament", **params)
+
+    async def show(self, tournament, **params):
+        """Retrieve a single tournament record."""
+        return await self.client.fetch("GET", f"tournaments/{tournament}", **params)
+
+    async def update(self, tournament, **params):
+        """Update a tournament's attributes."""
+        return await self.client.fetch("PUT", f"tournaments/{tournament}", "tournament", **params)
+
+    async def destroy(self, tournament):
+        """Deletes a tournament along with all its associated records."""
+        await self.client.fetch("DELETE", f"tournaments/{tournament}")
+
+    async def start(self, tournament, **params):
+        """Start a tournament, opening up matches for score reporting."""
+        return await self.client.fetch("POST", f"tournaments/{tournament}/start", **params)
+
+    async def finalize(self, tournament, **params):
+        """Finalize a tournament that has had all match scores submitted."""
+        return await self.client.fetch("POST", f"tournaments/{tournament}/finalize", **params)
+
+    async def reset(self, tournament, **params):
+        """Reset a tournament, clearing all of its scores and attachments."""
+        return await self.client.fetch("POST", f"tournaments/{tournament}/reset", **params)
+
+
+class Participants:
+    def __init__(self, client: ChallongeClient):
+        self.client = client
+
+    async def index(self, tournament, **params):
+        """Retrieve a tournament's participant list."""
+        return await self.client.fetch("GET", f"tournaments/{tournament}/participants", **params)
+
+    async def create(self, tournament, name: str, **params):
+        """Add a participant to a tournament."""
+        params.update({"name": name})
+        return await self.client.fetch("POST", f"tournaments/{tournament}/participants", "participant", **params)
+
+    async def bulk_add(self, tournament, names: list, **params):
+        """Add several participants to a tournament at once."""
+        params.update({"participants": [{"name": name} for name in names]})
+        return await self.client.fetch("POST", f"tournaments/{tournament}/participants/bulk_add", **params)
+
+    async def show(self, tournament, participant_id, **params):
+        """Retrieve a single participant record for a tournament."""
+        return await self.client.fetch("GET", f"tournaments/{tournament}/participants/{participant_id}", **params)
+
+    async def destroy(self, tournament, participant_id):
+        """Destroys or deactivates a participant."""
+        await self.client.fetch("DELETE", f"tournaments/{tournament}/participants/{participant_id}")
+
+    async def randomize(self, tournament):
+        """Randomize seeds among participants."""
+        await self.client.fetch("POST", f"tournaments/{tournament}/participants/randomize")
+
+
+class Matches:
+    def __init__(self, client: ChallongeClient):
+        self.client = client
+
+    async def index(self, tournament, **params):
+        """Retrieve a tournament's match list."""
+        return await self.client.fetch("GET", f"tournaments/{tournament}/matches", **params)
+
+    async def show(self, tournament, match_id, **params):
+        """Retrieve a single match record for a tournament."""
+        return await self.client.fetch("GET", f"tournaments/{tournament}/matches/{match_id}", **params)
+
+    async def update(self, tournament, match_id, **params):
+        """Update/submit the score(s) for a match."""
+        return await self.client.fetch("PUT", f"tournaments/{tournament}/matches/{match_id}", "match", **params)
+
+
+def _parse(data):
+    """
+    Recursively removes Challonge's single-key wrappers, e.g. ``{"tournament": {...}}`` -> ``{...}``.
+    """
+    if isinstance(data, list):
+        return [_parse(item) for item in data]
+    if isinstance(data, dict):
+        if len(data) == 1:
+            (key, value), = data.items()
+            if key in ("tournament", "participant", "match") and isinstance(value, dict):
+                data = value
+        return {key: _parse(value) if isinstance(value, (list, dict)) else value for key, value in data.items()}
+    return data
+
+
+def _prepare_params(dirty_params: dict, prefix: str = None) -> list:
+    """
+    Converts keyword parameters into the list of ``(key, value)`` pairs Challonge expects.
+    """
+    params = []
+    for key, value in dirty_params.items():
+        if value is None:
+            continue
+        name = f"{prefix}[{key}]" if prefix else key
+        if isinstance(value, (tuple, list)) and value and all(isinstance(item, dict) for item in value):
+            # A list of records, e.g. participants=[{"name": ...}] -> participants[][name]
+            for item in value:
+                for item_key, item_value in item.items():
+                    params.append((f"{name}[][{item_key}]", _prepare_value(item_value)))
+        elif isinstance(value, (tuple, list)):
+            for item in value:
+                params.append((f"{name}[]", _prepare_value(item)))
+        else:
+            params.append((name, _prepare_value(value)))
+    return params
+
+
+def _prepare_value(value) -> str:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, bool):
+        # Challonge only accepts lowercase true/false.
+        return str(value).lower()
+    return str(value)
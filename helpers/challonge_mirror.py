@@ -0,0 +1,435 @@
+import asyncio
+import datetime
+import json
+
+from exceptions import ChallongeError
+from helpers.models import Match, Participant, Roster, Tournament
+from helpers.name_index import MAX_CHOICES, PrefixIndex
+from helpers.rate_limiter import BACKGROUND, set_priority
+from helpers.tournament_catalog import ACTIVE_FILTERS, STATE_FILTERS
+
+# Tournaments in these states no longer change, their participants and matches are only fetched when first read.
+ENDED_STATES = STATE_FILTERS["ended"]
+_ENDED_PLACEHOLDERS = ", ".join("?" for _ in ENDED_STATES)
+
+_UPSERT_TOURNAMENT = (
+    "INSERT INTO challonge_tournaments(id, subdomain, name, state, updated_at, created_at, data) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET name=excluded.name, state=excluded.state, "
+    "updated_at=excluded.updated_at, created_at=excluded.created_at, data=excluded.data"
+)
+
+
+class ChallongeMirror:
+    """
+    Local SQLite mirror of the tournaments, participants and matches of a set of Challonge subdomains.
+
+    The mirror polls each subdomain's pending and in progress tournaments every ``interval`` seconds and only
+    refetches the participants and matches of those whose ``updated_at`` changed since they were last fetched.
+    Completed tournaments are kept as a local archive: each poll only asks Challonge for the tournaments that ended
+    and were created after the newest archived one (the watermark), so the payload does not grow with the history. Commands that
+    change a tournament write the result through with :meth:`put_match`, :meth:`put_participant` and friends, or
+    call :meth:`invalidate` when Challonge may have changed more than what the API returned.
+    Read commands are then served from the local database instead of waiting on Challonge.
+
+    Caches built from mirrored data can register a callable in ``refresh_listeners``. Whenever a poll refetches a
+    tournament that changed on Challonge, it is called with the tournament, including its participants and matches.
+    """
+
+    def __init__(self, client, database, catalog, logger, subdomains: list = None, interval: float = 60.0):
+        self.client = client
+        self.database = database
+        self.catalog = catalog
+        self.logger = logger
+        self.subdomains = subdomains if subdomains is not None else [None]
+        self.interval = interval
+        self.refresh_listeners = []
+        self._task = None
+        self._locks = {}
+        self._sync_locks = {}
+        self._watermarks = {}
+        self._name_indexes = {}
+
+    def start(self):
+        """
+        Starts polling Challonge in the background. The database must be open.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._poll())
+
+    async def close(self):
+        """
+        Stops polling Challonge.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def sync(self, subdomain: str = None):
+        """
+        Brings the mirror of a subdomain up to date with Challonge.
+
+        :param subdomain: The Challonge community (subdomain), None for the account itself.
+        """
+        async with self._sync_locks.setdefault(subdomain, asyncio.Lock()):
+            await self._sync(subdomain)
+
+    async def archived(self, subdomain: str = None, name: str = None) -> list:
+        """
+        Returns the completed tournaments of a subdomain from the local archive, oldest first.
+
+        :param subdomain: The Challonge community (subdomain), None for the account itself.
+        :param name: Only return the tournaments with this case-insensitive name.
+        :return: The tournaments as :class:`Tournament` models.
+        """
+        if subdomain not in self._watermarks:
+            # The archive of a subdomain is filled by its first sync.
+            await self.sync(subdomain)
+        sql = f"SELECT data FROM challonge_tournaments WHERE subdomain IS ? AND state IN ({_ENDED_PLACEHOLDERS})"
+        params = (subdomain, *ENDED_STATES)
+        if name is not None:
+            sql += " AND name=?"
+            params += (name,)
+        rows = await self.database.fetchall(f"{sql} ORDER BY created_at", params)
+        return [Tournament.from_api(json.loads(row[0])) for row in rows]
+
+    async def refresh(self, tournament_id: int, subdomain: str = None) -> dict:
+        """
+        Refetches a tournament with its participants and matches and stores it in the mirror.
+
+        :param tournament_id: The Challonge tournament ID.
+        :param subdomain: The Challonge community (subdomain) hosting the tournament.
+        :return: The tournament, including its participants and matches.
+        """
+        async with self._lock(tournament_id):
+            return await self._refresh(tournament_id, subdomain)
+
+    async def participants(self, tournament_id: int, subdomain: str = None) -> list:
+        """
+        Returns the participants of a tournament, in Challonge's order.
+
+        :param tournament_id: The Challonge tournament ID.
+        :param subdomain: The Challonge community (subdomain) hosting the tournament.
+        :return: The participants as :class:`Participant` models.
+        """
+        await self._ensure(tournament_id, subdomain)
+        return [Participant.from_api(p) for p in await self._participant_data(tournament_id)]
+
+    async def roster(self, tournament_id: int, subdomain: str = None) -> Roster:
+        """
+        Returns the participants of a tournament, indexed by ID and by lowercase name.
+
+        :param tournament_id: The Challonge tournament ID.
+        :param subdomain: The Challonge community (subdomain) hosting the tournament.
+        :return: The roster of the tournament.
+        """
+        return Roster(await self.participants(tournament_id, subdomain))
+
+    async def complete_participant(self, tournament_id: int, prefix: str, limit: int = MAX_CHOICES) -> list:
+        """
+        Completes a participant name from the mirrored participants, for autocomplete. Never waits on Challonge,
+        a tournament that was not mirrored yet completes nothing.
+
+        :param tournament_id: The Challonge tournament ID.
+        :param prefix: What the user typed so far.
+        :param limit: The maximum number of names returned.
+        :return: The matching participant names.
+        """
+        index = self._name_indexes.get(tournament_id)
+        if index is None:
+            # Built once from the database, then served from memory until the participants change.
+            index = PrefixIndex(p['name'] for p in await self._participant_data(tournament_id))
+            self._name_indexes[tournament_id] = index
+        return index.complete(prefix, limit=limit)
+
+    async def matches(self, tournament_id: int, subdomain: str = None, state: str = "all") -> list:
+        """
+        Returns the matches of a tournament, in Challonge's order.
+
+        :param tournament_id: The Challonge tournament ID.
+        :param subdomain: The Challonge community (subdomain) hosting the tournament.
+        :param state: A Challonge match state filter ('all', 'pending', 'open', 'complete').
+        :return: The matches as :class:`Match` models.
+        """
+        await self._ensure(tournament_id, subdomain)
+        return [Match.from_api(m) for m in await self._match_data(tournament_id, state)]
+
+    async def tournament(self, tournament_id: int, subdomain: str = None) -> dict:
+        """
+        Returns a tournament with its participants and matches, like ``tournaments.show`` with both included.
+
+        :param tournament_id: The Challonge tournament ID.
+        :param subdomain: The Challonge community (subdomain) hosting the tournament.
+        :return: The tournament, including its participants and matches, as returned by Challonge.
+        """
+        await self._ensure(tournament_id, subdomain)
+        row = await self.database.fetchone("SELECT data FROM challonge_tournaments WHERE id=?", (tournament_id,))
+        tournament = json.loads(row[0])
+        tournament['participants'] = await self._participant_data(tournament_id)
+        tournament['matches'] = await self._match_data(tournament_id)
+        return tournament
+
+    async def put_participant(self, tournament_id: int, participant: dict):
+        """
+        Writes a participant returned by Challonge through to the mirror.
+
+        :param tournament_id: The Challonge tournament ID.
+        :param participant: The participant, as returned by Challonge.
+        """
+        await self.database.execute(
+            "INSERT INTO challonge_participants(id, tournament_id, position, data) VALUES (?, ?, "
+            "(SELECT COALESCE(MAX(position), -1) + 1 FROM challonge_participants WHERE tournament_id=?), ?) "
+            "ON CONFLICT(id) DO UPDATE SET data=excluded.data",
+            (participant['id'], tournament_id, tournament_id, json.dumps(participant)),
+        )
+        self._name_indexes.pop(tournament_id, None)
+
+    async def remove_participant(self, tournament_id: int, participant_id: int):
+        """
+        Removes a participant that was deleted from Challonge from the mirror.
+
+        :param tournament_id: The Challonge tournament ID.
+        :param participant_id: The Challonge participant ID.
+        """
+        await self.database.execute(
+            "DELETE FROM challonge_participants WHERE id=? AND tournament_id=?", (participant_id, tournament_id)
+        )
+        self._name_indexes.pop(tournament_id, None)
+
+    async def put_match(self, tournament_id: int, match: dict):
+        """
+        Writes a match returned by Challonge through to the mirror.
+
+        :param tournament_id: The Challonge tournament ID.
+        :param match: The match, as returned by Challonge.
+        """
+        await self.database.execute(
+            "INSERT INTO challonge_matches(id, tournament_id, state, position, data) VALUES (?, ?, ?, "
+            "(SELECT COALESCE(MAX(position), -1) + 1 FROM challonge_matches WHERE tournament_id=?), ?) "
+            "ON CONFLICT(id) DO UPDATE SET state=excluded.state, data=excluded.data",
+            (match['id'], tournament_id, match['state'], tournament_id, json.dumps(match)),
+        )
+
+    async def record_match(self, tournament_id: int, match: dict, subdomain: str = None) -> bool:
+        """
+        Writes a reported match through to the mirror and tells whether it completed the tournament.
+
+        Completion is decided from the mirrored matches. Only when the tournament's last match was reported and the
+        mirror still lists unfinished matches (e.g. reported on Challonge since the last poll) is the bracket
+        refetched to confirm.
+
+        :param tournament_id: The Challonge tournament ID.
+        :param match: The reported match, as returned by Challonge.
+        :param subdomain: The Challonge community (subdomain) hosting the tournament.
+        :return: True if every match of the tournament is complete.
+        """
+        await self.put_match(tournament_id, match)
+        await self._ensure(tournament_id, subdomain)
+        matches = await self._match_data(tournament_id)
+        if all(m['state'] == 'complete' for m in matches):
+            return True
+
+        if _is_last_match(match, matches):
+            matches = (await self.refresh(tournament_id, subdomain=subdomain))['matches']
+            return all(m['state'] == 'complete' for m in matches)
+
+        # Move the players on to the matches waiting on this result, like Challonge just did
+        for advanced in _advance(match, matches):
+            await self.put_match(tournament_id, advanced)
+        return False
+
+    async def invalidate(self, tournament_id: int):
+        """
+        Marks the participants and matches of a tournament as stale, so they are refetched on the next read.
+
+        :param tournament_id: The Challonge tournament ID.
+        """
+        await self.database.execute("UPDATE challonge_tournaments SET synced_version=NULL WHERE id=?", (tournament_id,))
+
+    async def remove_tournament(self, tournament_id: int):
+        """
+        Removes a tournament that was deleted from Challonge from the mirror.
+
+        :param tournament_id: The Challonge tournament ID.
+        """
+        async def operation(db):
+            await _delete_tournament(db, tournament_id)
+
+        await self.database.write(operation)
+        self._name_indexes.pop(tournament_id, None)
+
+    def _lock(self, tournament_id: int) -> asyncio.Lock:
+        return self._locks.setdefault(tournament_id, asyncio.Lock())
+
+    async def _is_synced(self, tournament_id: int) -> bool:
+        row = await self.database.fetchone(
+            "SELECT synced_version IS NOT NULL FROM challonge_tournaments WHERE id=?", (tournament_id,)
+        )
+        return row is not None and bool(row[0])
+
+    async def _ensure(self, tournament_id: int, subdomain: str = None):
+        # Tournaments that were never fetched (or were invalidated) are loaded from Challonge on first read, once.
+        if await self._is_synced(tournament_id):
+            return
+        async with self._lock(tournament_id):
+            if not await self._is_synced(tournament_id):
+                await self._refresh(tournament_id, subdomain)
+
+    async def _participant_data(self, tournament_id: int) -> list:
+        rows = await self.database.fetchall(
+            "SELECT data FROM challonge_participants WHERE tournament_id=? ORDER BY position", (tournament_id,)
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    async def _match_data(self, tournament_id: int, state: str = "all") -> list:
+        if state == "all":
+            rows = await self.database.fetchall(
+                "SELECT data FROM challonge_matches WHERE tournament_id=? ORDER BY position", (tournament_id,)
+            )
+        else:
+            rows = await self.database.fetchall(
+                "SELECT data FROM challonge_matches WHERE tournament_id=? AND state=? ORDER BY position",
+                (tournament_id, state),
+            )
+        return [json.loads(row[0]) for row in rows]
+
+    async def _refresh(self, tournament_id: int, subdomain: str = None) -> dict:
+        tournament = await self.client.tournaments.show(tournament_id, include_participants=1, include_matches=1,
+                                                        subdomain=subdomain)
+
+        async def operation(db):
+            await db.execute(_UPSERT_TOURNAMENT, _tournament_row(tournament, subdomain))
+            await _replace_children(db, tournament_id, tournament['participants'], tournament['matches'])
+            await db.execute("UPDATE challonge_tournaments SET synced_version=? WHERE id=?",
+                             (str(tournament['updated_at']), tournament_id))
+
+        await self.database.write(operation)
+        self._name_indexes.pop(tournament_id, None)
+        return tournament
+
+    async def _sync(self, subdomain: str = None):
+        lists = await asyncio.gather(*(
+            self.client.tournaments.index(state=state, subdomain=subdomain) for state in ACTIVE_FILTERS
+        ))
+        active = [tournament for tournaments in lists for tournament in tournaments]
+        # The fresh list also serves the catalog, so name lookups don't download it a second time.
+        self.catalog.load(subdomain, active)
+
+        watermark = await self._watermark(subdomain)
+        if watermark is None:
+            # Archive the whole history once, later syncs only fetch what ended since.
+            ended = await self.client.tournaments.index(state="ended", subdomain=subdomain)
+        else:
+            # A day of overlap covers time zones, archiving a tournament twice is harmless.
+            created_after = datetime.date.fromisoformat(watermark[:10]) - datetime.timedelta(days=1)
+            ended = await self.client.tournaments.index(state="ended", created_after=created_after,
+                                                        subdomain=subdomain)
+
+        known = {row[0]: row[1] for row in await self.database.fetchall(
+            f"SELECT id, synced_version FROM challonge_tournaments WHERE subdomain IS ? "
+            f"AND state NOT IN ({_ENDED_PLACEHOLDERS})", (subdomain, *ENDED_STATES)
+        )}
+
+        # Running tournaments that are in neither list ended although they were created before the watermark, or
+        # were destroyed. They are rare, so each one is looked up on its own.
+        removed = []
+        seen = {t['id'] for t in active} | {t['id'] for t in ended}
+        for tournament_id in set(known) - seen:
+            try:
+                ended.append(await self.client.tournaments.show(tournament_id, subdomain=subdomain))
+            except ChallongeError as e:
+                if e.status != 404:
+                    raise
+                removed.append(tournament_id)
+
+        async def operation(db):
+            await db.executemany(_UPSERT_TOURNAMENT, [_tournament_row(t, subdomain) for t in active + ended])
+            for tournament_id in removed:
+                await _delete_tournament(db, tournament_id)
+
+        await self.database.write(operation)
+        for tournament_id in removed:
+            self._name_indexes.pop(tournament_id, None)
+        self._watermarks[subdomain] = max(
+            [str(t['created_at']) for t in ended if t['state'] in ENDED_STATES] + ([watermark] if watermark else []),
+            default=None,
+        )
+
+        for tournament in active:
+            if known.get(tournament['id']) != str(tournament['updated_at']):
+                refreshed = await self.refresh(tournament['id'], subdomain=subdomain)
+                for listener in self.refresh_listeners:
+                    listener(refreshed)
+
+    async def _watermark(self, subdomain: str = None):
+        if subdomain in self._watermarks:
+            return self._watermarks[subdomain]
+        row = await self.database.fetchone(
+            f"SELECT MAX(created_at) FROM challonge_tournaments WHERE subdomain IS ? "
+            f"AND state IN ({_ENDED_PLACEHOLDERS})", (subdomain, *ENDED_STATES)
+        )
+        return row[0] if row is not None else None
+
+    async def _poll(self):
+        # Polling must never hold up player commands.
+        set_priority(BACKGROUND)
+        while True:
+            for subdomain in self.subdomains:
+                try:
+                    await self.sync(subdomain)
+                except Exception as e:
+                    self.logger.warning(f"Failed to sync the Challonge mirror of {subdomain or 'the account'}: {e}")
+            await asyncio.sleep(self.interval)
+
+
+def _is_last_match(match: dict, matches: list) -> bool:
+    # The last match is in the last round and no other match waits on its result.
+    last_round = max(m['round'] for m in matches)
+    return match['round'] == last_round and not any(
+        match['id'] in (m.get('player1_prereq_match_id'), m.get('player2_prereq_match_id')) for m in matches
+    )
+
+
+def _advance(match: dict, matches: list) -> list:
+    advanced = []
+    for waiting in matches:
+        changed = False
+        for slot in ("player1", "player2"):
+            if waiting.get(f"{slot}_prereq_match_id") != match['id']:
+                continue
+            is_loser = waiting.get(f"{slot}_is_prereq_match_loser")
+            waiting[f"{slot}_id"] = match.get('loser_id') if is_loser else match.get('winner_id')
+            changed = True
+        if changed:
+            if waiting['state'] == 'pending' and waiting['player1_id'] is not None and waiting['player2_id'] is not None:
+                waiting['state'] = 'open'
+            advanced.append(waiting)
+    return advanced
+
+
+def _tournament_row(tournament: dict, subdomain: str) -> tuple:
+    data = {k: v for k, v in tournament.items() if k not in ("participants", "matches")}
+    return (tournament['id'], subdomain, tournament['name'], tournament['state'], str(tournament['updated_at']),
+            str(tournament['created_at']), json.dumps(data))
+
+
+async def _replace_children(db, tournament_id: int, participants: list, matches: list):
+    await db.execute("DELETE FROM challonge_participants WHERE tournament_id=?", (tournament_id,))
+    await db.execute("DELETE FROM challonge_matches WHERE tournament_id=?", (tournament_id,))
+    await db.executemany(
+        "INSERT INTO challonge_participants(id, tournament_id, position, data) VALUES (?, ?, ?, ?)",
+        [(p['id'], tournament_id, i, json.dumps(p)) for i, p in enumerate(participants)],
+    )
+    await db.executemany(
+        "INSERT INTO challonge_matches(id, tournament_id, state, position, data) VALUES (?, ?, ?, ?, ?)",
+        [(m['id'], tournament_id, m['state'], i, json.dumps(m)) for i, m in enumerate(matches)],
+    )
+
+
+async def _delete_tournament(db, tournament_id: int):
+    await db.execute("DELETE FROM challonge_participants WHERE tournament_id=?", (tournament_id,))
+    await db.execute("DELETE FROM challonge_matches WHERE tournament_id=?", (tournament_id,))
+    await db.execute("DELETE FROM challonge_tournaments WHERE id=?", (tournament_id,))
@@ -1,6 +1,3 @@
-import json
-import os
-
 from exceptions import *
 
 
@@ -10,11 +7,8 @@ def is_owner():
     """
 
     async def predicate(context: commands.Context):
-        with open(
-            f"{os.path.realpath(os.path.dirname(__file__))}/../config.json"
-        ) as file:
-            data = json.load(file)
-        if context.author.id not in data["owners"]:
+        # The owners are read from the in-memory config, see helpers/config.py
+        if context.author.id not in context.bot.config.owners:
             raise UserNotOwner
         return True
 
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+
+CONFIG_PATH = f"{os.path.realpath(os.path.dirname(__file__))}/../config.json"
+
+# The Challonge account (None) and communities the mirror polls unless config.json lists others.
+DEFAULT_SUBDOMAINS = (None, "hrhighlander", "b5d0ca83e61253ea7f84a60c")
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """
+    The parsed and validated contents of config.json.
+    """
+
+    prefix: str
+    token: str
+    owners: frozenset
+    sync_commands_globally: bool
+    CHALLONGE_USER: str
+    CHALLONGE_KEY: str
+    application_id: int = None
+    permissions: int = None
+    challonge_subdomains: tuple = DEFAULT_SUBDOMAINS
+    bracket_cache_dir: str = None
+    log_json_file: str = None
+    log_json_max_bytes: int = 10 * 1024 * 1024
+    log_json_backup_count: int = 5
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Config":
+        """
+        Validates a loaded config.json.
+
+        :param data: The JSON document.
+        :return: The config.
+        :raises ValueError: If a setting is missing or has the wrong type.
+        """
+        for key, kind in (("prefix", str), ("token", str), ("owners", list), ("sync_commands_globally", bool),
+                          ("CHALLONGE_USER", str), ("CHALLONGE_KEY", str)):
+            if not isinstance(data.get(key), kind):
+                raise ValueError(f"'{key}' is missing from config.json or is not a {kind.__name__}.")
+        if not all(isinstance(owner, int) for owner in data["owners"]):
+            raise ValueError("'owners' in config.json must only contain user IDs.")
+
+        return cls(
+            prefix=data["prefix"],
+            token=data["token"],
+            owners=frozenset(data["owners"]),
+            sync_commands_globally=data["sync_commands_globally"],
+            CHALLONGE_USER=data["CHALLONGE_USER"],
+            CHALLONGE_KEY=data["CHALLONGE_KEY"],
+            application_id=data.get("application_id"),
+            permissions=data.get("permissions"),
+            challonge_subdomains=tuple(data.get("challonge_subdomains", DEFAULT_SUBDOMAINS)),
+            bracket_cache_dir=data.get("bracket_cache_dir"),
+            log_json_file=data.get("log_json_file"),
+            log_json_max_bytes=data.get("log_json_max_bytes", 10 * 1024 * 1024),
+            log_json_backup_count=data.get("log_json_backup_count", 5),
+        )
+
+
+class ConfigService:
+    """
+    Holds the bot's config in memory and reloads it when config.json changes.
+
+    The file is parsed once at startup. A background task then checks its modification time every ``interval``
+    seconds and swaps in the new config in one assignment, so readers always see either the old or the new config,
+    never a mix. A changed file that fails validation is logged and the previous config is kept. Settings read once
+    at startup (the token, the Challonge credentials, ...) still need a restart.
+
+    Settings are read as attributes, e.g. ``bot.config.owners``.
+    """
+
+    def __init__(self, path: str = CONFIG_PATH, logger=None, interval: float = 5.0):
+        self.path = path
+        self.logger = logger
+        self.interval = interval
+        self.current = None
+        self._mtime = None
+        self._task = None
+
+    def __getattr__(self, name: str):
+        # Only called for names the service itself does not have, i.e. the settings.
+        if name.startswith("_") or self.current is None:
+            raise AttributeError(name)
+        return getattr(self.current, name)
+
+    def load(self) -> Config:
+        """
+        Reads and validates config.json, then makes it the current config.
+
+        :return: The new config.
+        :raises OSError: If the file cannot be read.
+        :raises ValueError: If the file is not valid JSON or fails validation.
+        """
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path) as file:
+            config = Config.from_dict(json.load(file))
+        self.current = config
+        self._mtime = mtime
+        return config
+
+    def start(self):
+        """
+        Starts watching config.json for changes.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def close(self):
+        """
+        Stops watching config.json.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if os.stat(self.path).st_mtime_ns == self._mtime:
+                    continue
+                self.load()
+            except (OSError, ValueError) as e:
+                if self.logger is not None:
+                    self.logger.warning(f"Failed to reload config.json, keeping the previous config: {e}")
+                # Don't retry until the file changes again.
+                try:
+                    self._mtime = os.stat(self.path).st_mtime_ns
+                except OSError:
+                    pass
+                continue
+            if self.logger is not None:
+                self.logger.info("Reloaded config.json.")
@@ -0,0 +1,179 @@
+import asyncio
+import os
+import re
+
+import aiosqlite
+
+# Applied to every connection. WAL lets the readers run while the writer commits, and with WAL a NORMAL
+# synchronous level is still safe against corruption, only the last transactions can be lost on power failure.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA foreign_keys=ON",
+)
+
+
+class Database:
+    """
+    A long-lived SQLite database with one writer connection and a small pool of read connections.
+
+    Writes are submitted to a queue and executed one at a time, each in its own transaction, so they never
+    contend for the database lock. Reads borrow one of the read connections and run concurrently with the writer.
+    Call :meth:`open` once at startup and :meth:`close` on shutdown.
+    """
+
+    def __init__(self, path: str, readers: int = 3):
+        self.path = path
+        self.readers = readers
+        self._writer = None
+        self._writes = None
+        self._write_task = None
+        self._read_pool = None
+        self._read_connections = []
+
+    async def open(self):
+        """
+        Opens the writer and read connections and starts processing the write queue.
+        """
+        self._writer = await self._connect()
+        self._writes = asyncio.Queue()
+        self._write_task = asyncio.create_task(self._process_writes())
+        self._read_pool = asyncio.Queue()
+        for _ in range(self.readers):
+            connection = await self._connect()
+            await connection.execute("PRAGMA query_only=ON")
+            self._read_connections.append(connection)
+            self._read_pool.put_nowait(connection)
+
+    async def close(self):
+        """
+        Finishes the queued writes and closes every connection.
+        """
+        if self._write_task is not None:
+            await self._writes.join()
+            self._write_task.cancel()
+            self._write_task = None
+        for connection in self._read_connections:
+            await connection.close()
+        self._read_connections = []
+        if self._writer is not None:
+            await self._writer.close()
+            self._writer = None
+
+    async def write(self, operation):
+        """
+        Queues a write and waits for it to be committed.
+
+        :param operation: A coroutine function called with the writer connection. Everything it executes is
+            committed together, or rolled back if it raises.
+        :return: The value returned by the operation.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((operation, future))
+        return await future
+
+    async def execute(self, sql: str, parameters: tuple = ()):
+        """
+        Queues a single write statement and waits for it to be committed.
+
+        :param sql: The SQL statement.
+        :param parameters: The statement parameters.
+        :return: The number of rows changed by the statement.
+        """
+        async def operation(db):
+            cursor = await db.execute(sql, parameters)
+            return cursor.rowcount
+
+        return await self.write(operation)
+
+    async def executescript(self, script: str):
+        """
+        Queues a SQL script (e.g. the schema) and waits for it to be committed.
+
+        :param script: The SQL script.
+        """
+        async def operation(db):
+            await db.executescript(script)
+
+        await self.write(operation)
+
+    async def migrate(self, directory: str) -> int:
+        """
+        Applies the pending migrations from a directory.
+
+        Migrations are SQL scripts named ``<version>_<description>.sql``. The database's ``user_version`` records the
+        last applied version, and each pending script runs in its own transaction together with the version bump.
+
+        :param directory: The directory containing the migration scripts.
+        :return: The schema version after migrating.
+        """
+        migrations = []
+        for name in os.listdir(directory):
+            match = re.fullmatch(r"(\d+)_\w+\.sql", name)
+            if match:
+                migrations.append((int(match.group(1)), os.path.join(directory, name)))
+
+        version = (await self.fetchone("PRAGMA user_version"))[0]
+        for migration_version, path in sorted(migrations):
+            if migration_version <= version:
+                continue
+            with open(path) as file:
+                script = file.read()
+            await self.executescript(f"BEGIN;\n{script}\nPRAGMA user_version={migration_version};\nCOMMIT;")
+            version = migration_version
+        return version
+
+    async def fetchone(self, sql: str, parameters: tuple = ()):
+        """
+        Runs a query on a read connection and returns its first row.
+
+        :param sql: The SQL query.
+        :param parameters: The query parameters.
+        :return: The first row, or None if the query returned no rows.
+        """
+        connection = await self._read_pool.get()
+        try:
+            async with connection.execute(sql, parameters) as cursor:
+                return await cursor.fetchone()
+        finally:
+            self._read_pool.put_nowait(connection)
+
+    async def fetchall(self, sql: str, parameters: tuple = ()) -> list:
+        """
+        Runs a query on a read connection and returns every row.
+
+        :param sql: The SQL query.
+        :param parameters: The query parameters.
+        :return: The rows.
+        """
+        connection = await self._read_pool.get()
+        try:
+            async with connection.execute(sql, parameters) as cursor:
+                return await cursor.fetchall()
+        finally:
+            self._read_pool.put_nowait(connection)
+
+    async def _connect(self) -> aiosqlite.Connection:
+        connection = await aiosqlite.connect(self.path)
+        for pragma in PRAGMAS:
+            await connection.execute(pragma)
+        return connection
+
+    async def _process_writes(self):
+        while True:
+            operation, future = await self._writes.get()
+            try:
+                result = await operation(self._writer)
+                await self._writer.commit()
+            except Exception as e:
+                await self._writer.rollback()
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._writes.task_done()
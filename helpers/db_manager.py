@@ -1,8 +1,14 @@
 import os
-import aiosqlite
+
+from helpers.database import Database
 
 DATABASE_PATH = f"{os.path.realpath(os.path.dirname(__file__))}/../database/database.db"
 
+"""
+The database shared by every function of this module, opened once at startup by bot.py's init_db.
+"""
+database = Database(DATABASE_PATH)
+
 
 async def get_waitlist():
     """
@@ -10,12 +16,7 @@ async def get_waitlist():
 
     :return: True if the user is on waitlist, False if not.
     """
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        async with db.execute(
-            "SELECT user_id, hr_ign, strftime('%s', created_at) FROM waitlist"
-        ) as cursor:
-            result = await cursor.fetchall()
-            return result
+    return await database.fetchall("SELECT user_id, hr_ign, strftime('%s', created_at) FROM waitlist")
 
 
 async def is_signed_up(user_id: int):
@@ -25,12 +26,8 @@ async def is_signed_up(user_id: int):
     :param user_id: The ID of the user that should be checked.
     :return: True if the user is signed up, False if not.
     """
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        async with db.execute(
-            "SELECT * FROM waitlist WHERE user_id=?", (user_id,)
-        ) as cursor:
-            result = await cursor.fetchone()
-            return result is not None
+    result = await database.fetchone("SELECT 1 FROM waitlist WHERE user_id=?", (user_id,))
+    return result is not None
 
 
 async def add_user_to_waitlist(user_id: int, hr_ign: str):
@@ -40,13 +37,13 @@ async def add_user_to_waitlist(user_id: int, hr_ign: str):
     :param user_id: The ID of the user that should be added into the waitlist.
     :param hr_ign: The Hero Realms In Game Name of the user to be added into the waitlist.
     """
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        await db.execute("INSERT INTO waitlist(user_id, hr_ign) VALUES (?, ?)", (user_id, hr_ign))
-        await db.commit()
-        rows = await db.execute("SELECT COUNT(*) FROM waitlist")
-        async with rows as cursor:
-            result = await cursor.fetchone()
-            return result[0] if result is not None else 0
+    async def operation(db):
+        await db.execute(
+            "INSERT INTO waitlist(user_id, hr_ign) VALUES (?, ?) ON CONFLICT(user_id) DO NOTHING", (user_id, hr_ign)
+        )
+        return await _count_waitlist(db)
+
+    return await database.write(operation)
 
 
 async def remove_user_from_waitlist(user_id: int):
@@ -55,13 +52,11 @@ async def remove_user_from_waitlist(user_id: int):
 
     :param user_id: The ID of the user that should be removed from the waitlist.
     """
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    async def operation(db):
         await db.execute("DELETE FROM waitlist WHERE user_id=?", (user_id,))
-        await db.commit()
-        rows = await db.execute("SELECT COUNT(*) FROM waitlist")
-        async with rows as cursor:
-            result = await cursor.fetchone()
-            return result[0] if result is not None else 0
+        return await _count_waitlist(db)
+
+    return await database.write(operation)
 
 
 async def add_user_to_participants(user_id: int, hr_ign: str):
@@ -71,21 +66,36 @@ async def add_user_to_participants(user_id: int, hr_ign: str):
     :param user_id: The ID of the user that should be added into the participants list.
     :param hr_ign: The Hero Realms In Game Name of the user to be added into the participants list.
     """
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        cursor = await db.execute("SELECT * FROM tcl_participants WHERE user_id = ?", (user_id,))
-        data = await cursor.fetchone()
-        if data is None:
-            await db.execute("INSERT INTO tcl_participants(user_id, hr_ign) VALUES (?, ?)", (user_id, hr_ign))
-            await db.commit()
+    await database.execute(
+        "INSERT INTO tcl_participants(user_id, hr_ign) VALUES (?, ?) ON CONFLICT(user_id) DO NOTHING", (user_id, hr_ign)
+    )
 
 
 async def clear_waitlist():
     """
     This function will remove all users from the waitlist.
     """
-    async with aiosqlite.connect(DATABASE_PATH) as db:
+    await database.execute("DELETE FROM waitlist")
+
+
+async def move_waitlist_to_participants():
+    """
+    This function will move every user on the waitlist to the participants list and clear the waitlist, atomically.
+
+    :return: The users that were on the waitlist, as (user_id, hr_ign, created_at) rows.
+    """
+    async def operation(db):
+        async with db.execute("SELECT user_id, hr_ign, strftime('%s', created_at) FROM waitlist") as cursor:
+            waitlist = await cursor.fetchall()
+        # "WHERE true" keeps SQLite from parsing ON CONFLICT as part of the SELECT's join clause.
+        await db.execute(
+            "INSERT INTO tcl_participants(user_id, hr_ign) SELECT user_id, hr_ign FROM waitlist WHERE true "
+            "ON CONFLICT(user_id) DO NOTHING"
+        )
         await db.execute("DELETE FROM waitlist")
-        await db.commit()
+        return waitlist
+
+    return await database.write(operation)
 
 
 async def get_user_id_from_db(hr_ign):
@@ -95,7 +105,27 @@ async def get_user_id_from_db(hr_ign):
     :param hr_ign: The HR IGN for which to retrieve the user ID.
     :return: The user ID if found, None otherwise.
     """
-    async with aiosqlite.connect(DATABASE_PATH) as db:
-        async with db.execute("SELECT user_id FROM tcl_participants WHERE hr_ign=?", (hr_ign,)) as cursor:
-            result = await cursor.fetchone()
-            return result[0] if result is not None else None
+    result = await database.fetchone("SELECT user_id FROM tcl_participants WHERE hr_ign=?", (hr_ign,))
+    return result[0] if result is not None else None
+
+
+async def get_user_ids_from_db(hr_igns: list) -> dict:
+    """
+    Retrieve the user IDs of several HR IGNs from the SQLite database in a single query.
+
+    :param hr_igns: The HR IGNs for which to retrieve the user IDs.
+    :return: The user IDs keyed by lowercase HR IGN. IGNs that are not registered are left out.
+    """
+    if not hr_igns:
+        return {}
+    placeholders = ", ".join("?" for _ in hr_igns)
+    rows = await database.fetchall(
+        f"SELECT hr_ign, user_id FROM tcl_participants WHERE hr_ign IN ({placeholders})", tuple(hr_igns)
+    )
+    return {hr_ign.lower(): user_id for hr_ign, user_id in rows}
+
+
+async def _count_waitlist(db) -> int:
+    async with db.execute("SELECT COUNT(*) FROM waitlist") as cursor:
+        result = await cursor.fetchone()
+        return result[0] if result is not None else 0
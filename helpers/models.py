@@ -0,0 +1,90 @@
+import dataclasses
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class Tournament:
+    """
+    A Challonge tournament, reduced to the fields the bot uses.
+    """
+
+    id: int
+    name: str
+    state: str
+    tournament_type: str = None
+    participants_count: int = None
+    full_challonge_url: str = None
+    live_image_url: str = None
+    created_at: str = None
+    updated_at: str = None
+
+    @classmethod
+    def from_api(cls, data: dict) -> "Tournament":
+        return _from_api(cls, data)
+
+
+@dataclass(frozen=True, slots=True)
+class Participant:
+    """
+    A Challonge participant, reduced to the fields the bot uses.
+    """
+
+    id: int
+    name: str
+
+    @classmethod
+    def from_api(cls, data: dict) -> "Participant":
+        return _from_api(cls, data)
+
+
+@dataclass(frozen=True, slots=True)
+class Match:
+    """
+    A Challonge match, reduced to the fields the bot uses.
+    """
+
+    id: int
+    state: str
+    round: int
+    player1_id: int = None
+    player2_id: int = None
+    winner_id: int = None
+    loser_id: int = None
+    scores_csv: str = None
+
+    @classmethod
+    def from_api(cls, data: dict) -> "Match":
+        return _from_api(cls, data)
+
+
+class Roster:
+    """
+    The participants of a tournament, indexed by ID and by lowercase name once instead of scanning the list.
+    """
+
+    __slots__ = ("participants", "by_id", "by_name")
+
+    def __init__(self, participants: list):
+        self.participants = participants
+        self.by_id = {p.id: p for p in participants}
+        self.by_name = {p.name.lower(): p for p in participants}
+
+    @classmethod
+    def from_api(cls, participants: list) -> "Roster":
+        return cls([Participant.from_api(p) for p in participants])
+
+    def __iter__(self):
+        return iter(self.participants)
+
+    def __len__(self) -> int:
+        return len(self.participants)
+
+
+_FIELD_NAMES = {}
+
+
+def _from_api(cls, data: dict):
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(field.name for field in dataclasses.fields(cls))
+    return cls(**{name: data.get(name) for name in names})
@@ -0,0 +1,55 @@
+import bisect
+
+from discord import app_commands
+
+# Discord shows at most 25 autocomplete choices.
+MAX_CHOICES = 25
+
+
+class PrefixIndex:
+    """
+    Sorted, case-insensitive index of names for autocomplete.
+
+    Every word of a name starts a key, so typing "12" finds "Quickfire 12" as well as "12 Rounds".
+    """
+
+    __slots__ = ("_keys",)
+
+    def __init__(self, names):
+        keys = set()
+        for name in names:
+            words = name.lower().split()
+            for i in range(len(words)):
+                keys.add((" ".join(words[i:]), name))
+        self._keys = sorted(keys)
+
+    def complete(self, prefix: str, limit: int = MAX_CHOICES, accept=None) -> list:
+        """
+        Returns the names with a word starting with the prefix.
+
+        :param prefix: What the user typed so far.
+        :param limit: The maximum number of names returned.
+        :param accept: Optional predicate on the name, names it rejects are skipped.
+        :return: The matching names, without duplicates.
+        """
+        prefix = " ".join(prefix.lower().split())
+        names = []
+        i = bisect.bisect_left(self._keys, (prefix,))
+        while i < len(self._keys) and len(names) < limit:
+            key, name = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            if name not in names and (accept is None or accept(name)):
+                names.append(name)
+            i += 1
+        return names
+
+
+def choices(names: list) -> list:
+    """
+    Turns names into autocomplete choices whose value is the name itself.
+
+    :param names: The names to offer.
+    :return: A list of app command choices.
+    """
+    return [app_commands.Choice(name=name, value=name) for name in names[:MAX_CHOICES]]
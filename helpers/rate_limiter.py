@@ -0,0 +1,139 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+
+# Priority lanes, lower goes first. Player commands are interactive, the mirror and pre-rendering run in the
+# background and season-wide organizer jobs are bulk.
+INTERACTIVE = 0
+BACKGROUND = 1
+BULK = 2
+
+LANE_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background", BULK: "bulk"}
+
+_current_priority = contextvars.ContextVar("challonge_priority", default=INTERACTIVE)
+
+
+def set_priority(level: int):
+    """
+    Sets the priority of the Challonge calls made by the current task (e.g. a command invocation). Every command
+    and background job runs in its own task, so the priority does not leak into other commands.
+
+    :param level: One of INTERACTIVE, BACKGROUND or BULK.
+    :raises ValueError: If the level is not a priority lane.
+    """
+    _check_lane(level)
+    _current_priority.set(level)
+
+
+def _check_lane(level: int):
+    if level not in LANE_NAMES:
+        raise ValueError(f"Unknown priority lane: {level!r}")
+
+
+class _LaneStats:
+    def __init__(self):
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float):
+        self.acquired += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+class RateLimiter:
+    """
+    A token bucket shared by every Challonge call, with priority lanes.
+
+    The bucket refills at ``rate`` tokens per second up to ``burst`` tokens. Waiting calls are served strictly by
+    priority, then in arrival order. Bulk calls may not dip below ``bulk_reserve`` tokens, so they are smoothed out
+    to the steady rate and a player command arriving in the middle of a season job never waits for the burst to drain.
+    """
+
+    def __init__(self, rate: float = 2.0, burst: int = 5, bulk_reserve: int = 2):
+        self.rate = rate
+        self.burst = burst
+        self.bulk_reserve = bulk_reserve
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._wakeup = None
+        self._stats = {level: _LaneStats() for level in LANE_NAMES}
+
+    async def acquire(self, level: int = None):
+        """
+        Waits for a token.
+
+        :param level: The priority lane, defaults to the priority of the current task.
+        :raises ValueError: If the level is not a priority lane.
+        """
+        level = _current_priority.get() if level is None else level
+        _check_lane(level)
+        started = time.monotonic()
+        self._refill()
+        if not self._waiters and self._tokens - 1 >= self._floor(level):
+            self._tokens -= 1
+            self._stats[level].record(0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (level, next(self._sequence), future))
+        # A new waiter may outrank the one the pending wakeup was scheduled for.
+        self._dispatch()
+        await future
+        self._stats[level].record(time.monotonic() - started)
+
+    def metrics(self) -> dict:
+        """
+        Returns the current queue depth and the wait times of each lane.
+
+        :return: A dictionary keyed by lane name, plus the tokens currently available.
+        """
+        self._refill()
+        depth = {level: 0 for level in LANE_NAMES}
+        for level, _, future in self._waiters:
+            if not future.done():
+                depth[level] += 1
+
+        metrics = {"tokens": round(self._tokens, 2)}
+        for level, name in LANE_NAMES.items():
+            stats = self._stats[level]
+            metrics[name] = {
+                "queued": depth[level],
+                "acquired": stats.acquired,
+                "average_wait": stats.total_wait / stats.acquired if stats.acquired else 0.0,
+                "max_wait": stats.max_wait,
+            }
+        return metrics
+
+    def _floor(self, level: int) -> int:
+        return self.bulk_reserve if level == BULK else 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _dispatch(self):
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        self._refill()
+        while self._waiters:
+            level, _, future = self._waiters[0]
+            if future.done():
+                # The waiting call was cancelled.
+                heapq.heappop(self._waiters)
+                continue
+            if self._tokens - 1 < self._floor(level):
+                # The next token is due later, wake up then.
+                delay = (1 + self._floor(level) - self._tokens) / self.rate
+                self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            future.set_result(None)
@@ -0,0 +1,184 @@
+import itertools
+import operator
+
+
+class DivisionStandings:
+    """
+    Standings of a single Thandar Combat League division.
+
+    Results are kept per match so that a reported (or re-reported) match only adjusts the two players involved
+    instead of re-parsing every match of the division. A pairwise matrix of match wins is kept alongside, so
+    head-to-head tiebreaks never need the match list again.
+    """
+
+    def __init__(self, tournament_id: int, participants: dict):
+        self.tournament_id = tournament_id
+        self.names = dict(participants)
+        self.results = {}
+        self.stats = {player_id: _empty_stats() for player_id in self.names}
+        self.head_to_head = {}
+
+    @classmethod
+    def from_tournament(cls, tournament: dict):
+        """
+        Builds the standings from a tournament fetched with ``include_participants`` and ``include_matches``.
+
+        :param tournament: The tournament, including its participants and matches.
+        :return: The division standings.
+        """
+        division = cls(tournament['id'], {p['id']: p['name'] for p in tournament['participants']})
+        for match in tournament['matches']:
+            division.record(match['id'], match['player1_id'], match['player2_id'], match['scores_csv'])
+        return division
+
+    def record(self, match_id: int, player1_id: int, player2_id: int, scores_csv: str):
+        """
+        Records the result of a match, replacing any result previously recorded for it.
+
+        :param match_id: The Challonge match ID.
+        :param player1_id: The participant ID of player 1.
+        :param player2_id: The participant ID of player 2.
+        :param scores_csv: The Challonge score string, e.g. "2-1". Empty for unplayed matches.
+        """
+        if player1_id is None or player2_id is None:
+            return
+        previous = self.results.pop(match_id, None)
+        if previous is not None:
+            self._apply(*previous, sign=-1)
+        if scores_csv:
+            player1_score, player2_score = _parse_scores(scores_csv)
+            self.results[match_id] = (player1_id, player2_id, player1_score, player2_score)
+            self._apply(player1_id, player2_id, player1_score, player2_score, sign=1)
+
+    def reconcile(self, matches: list) -> int:
+        """
+        Records the matches whose result differs from the recorded one, e.g. results reported or changed on
+        Challonge directly. Matches already recorded with the same score are left alone.
+
+        :param matches: The division's matches as dictionaries.
+        :return: The number of matches whose result changed.
+        """
+        changed = 0
+        for match in matches:
+            expected = None
+            if match['scores_csv'] and match['player1_id'] is not None and match['player2_id'] is not None:
+                expected = (match['player1_id'], match['player2_id'], *_parse_scores(match['scores_csv']))
+            recorded = self.results.get(match['id'])
+            if recorded == expected:
+                continue
+            if expected is None:
+                # The result was cleared on Challonge
+                self.record(match['id'], recorded[0], recorded[1], "")
+            else:
+                self.record(match['id'], match['player1_id'], match['player2_id'], match['scores_csv'])
+            changed += 1
+        return changed
+
+    def _apply(self, player1_id: int, player2_id: int, player1_score: int, player2_score: int, sign: int):
+        player1 = self.stats.setdefault(player1_id, _empty_stats())
+        player2 = self.stats.setdefault(player2_id, _empty_stats())
+
+        # Update player statistics based on match results
+        player1['wins'] += sign * player1_score
+        player1['losses'] += sign * player2_score
+        player2['wins'] += sign * player2_score
+        player2['losses'] += sign * player1_score
+
+        # Increment match wins and losses, and the head-to-head record of the winner against the loser
+        if player1_score > player2_score:
+            player1['match_wins'] += sign
+            player2['match_losses'] += sign
+            pair = (player1_id, player2_id)
+        else:
+            player1['match_losses'] += sign
+            player2['match_wins'] += sign
+            pair = (player2_id, player1_id)
+        self.head_to_head[pair] = self.head_to_head.get(pair, 0) + sign
+
+    def table(self) -> list:
+        """
+        Returns the standings, sorted by win percentage, match wins, head-to-head among tied players and finally
+        game differential.
+
+        :return: A list of dictionaries with the name, wins, losses, win percentage and match wins of each player.
+        """
+        standings = []
+        for player_id, stats in self.stats.items():
+            games = stats['wins'] + stats['losses']
+            standings.append({
+                "id": player_id,
+                "name": self.names.get(player_id, "Unknown"),
+                "wins": stats['wins'],
+                "losses": stats['losses'],
+                "win_percentage": round(stats['wins'] / games * 100, 2) if games else 0.0,
+                "match_wins": stats['match_wins'],
+            })
+        standings.sort(key=operator.itemgetter('win_percentage', 'match_wins'), reverse=True)
+
+        # Resolve ties (of any size) between players with the same win percentage and match wins
+        ordered = []
+        for _, group in itertools.groupby(standings, key=operator.itemgetter('win_percentage', 'match_wins')):
+            group = list(group)
+            if len(group) > 1:
+                group.sort(key=self._tiebreak_key([player['id'] for player in group]), reverse=True)
+            ordered.extend(group)
+        return ordered
+
+    def _tiebreak_key(self, tied_ids: list):
+        # Head-to-head match wins against the other tied players: O(k²) matrix lookups for a k-way tie.
+        head_to_head = {
+            player_id: sum(self.head_to_head.get((player_id, other_id), 0) for other_id in tied_ids)
+            for player_id in tied_ids
+        }
+
+        def key(player: dict):
+            return head_to_head[player['id']], player['wins'] - player['losses']
+
+        return key
+
+
+class StandingsStore:
+    """
+    In-memory standings for every division that has been looked at, keyed by Challonge tournament ID.
+    """
+
+    def __init__(self):
+        self._divisions = {}
+
+    def get(self, tournament_id: int):
+        return self._divisions.get(tournament_id)
+
+    def put(self, division: DivisionStandings):
+        self._divisions[division.tournament_id] = division
+
+    def invalidate(self, tournament_id: int):
+        self._divisions.pop(tournament_id, None)
+
+    def reconcile(self, tournament: dict):
+        """
+        Brings the cached standings of a division in line with a tournament refetched from Challonge.
+
+        Only matches whose score changed are applied, so the bot's own reports, which are already recorded, cost
+        nothing. The standings are dropped, and rebuilt on the next request, if players were added or removed.
+
+        :param tournament: The tournament, including its participants and matches.
+        """
+        division = self._divisions.get(tournament['id'])
+        if division is None:
+            return
+        names = {p['id']: p['name'] for p in tournament['participants']}
+        if names.keys() != division.names.keys():
+            self.invalidate(tournament['id'])
+            return
+        division.names = names
+        division.reconcile(tournament['matches'])
+
+
+def _empty_stats() -> dict:
+    return {"wins": 0, "losses": 0, "match_wins": 0, "match_losses": 0}
+
+
+def _parse_scores(scores_csv: str) -> tuple:
+    # Only the first set is used; TCL matches are reported as a single "games won-games lost" set.
+    scores = scores_csv.split(',')[0].split('-')
+    return int(scores[0]), int(scores[1])
@@ -0,0 +1,204 @@
+import asyncio
+import time
+
+from helpers.models import Tournament
+from helpers.name_index import MAX_CHOICES, PrefixIndex
+from helpers.rate_limiter import BACKGROUND, set_priority
+
+# Maps the state filters accepted by Challonge's tournament index to the tournament states they cover.
+STATE_FILTERS = {
+    "all": None,
+    "pending": {"pending", "checking_in", "checked_in"},
+    "in progress": {"underway", "awaiting_review", "group_stages_underway", "group_stages_finalized"},
+    "in_progress": {"underway", "awaiting_review", "group_stages_underway", "group_stages_finalized"},
+    "ended": {"complete"},
+}
+
+# The state filters fetched from Challonge to build an index. Ended tournaments never change and come from the archive.
+ACTIVE_FILTERS = ("pending", "in_progress")
+
+
+class _SubdomainIndex:
+    """
+    Name, prefix and state indexes over the pending and in progress tournaments of one Challonge subdomain.
+    """
+
+    def __init__(self, tournaments: list):
+        self.loaded_at = time.monotonic()
+        self.tournaments = [Tournament.from_api(tournament) for tournament in tournaments]
+        self.by_name = {}
+        self.by_state = {}
+        for tournament in self.tournaments:
+            self.by_name.setdefault(tournament.name.lower(), []).append(tournament)
+            self.by_state.setdefault(tournament.state, []).append(tournament)
+        self.names = PrefixIndex(tournament.name for tournament in self.tournaments)
+
+    def age(self) -> float:
+        return time.monotonic() - self.loaded_at
+
+
+class TournamentCatalog:
+    """
+    Shared cache of Challonge tournaments, indexed by lowercase name and by state for each subdomain. Tournaments are
+    kept as compact :class:`Tournament` models rather than the API's dictionaries.
+
+    Only pending and in progress tournaments are fetched from Challonge, so the index stays small however long the
+    history grows. Lookups that include ended tournaments ('all' and 'ended') also search ``archive``, the local
+    archive of completed tournaments (see :meth:`ChallongeMirror.archived`).
+
+    Lookups are served from memory while the index is younger than ``ttl`` seconds. Commands that create, start,
+    finalize or remove tournaments must call :meth:`invalidate` so the next lookup sees the change.
+    """
+
+    def __init__(self, client, archive=None, ttl: float = 300.0, miss_refresh_interval: float = 30.0):
+        self.client = client
+        self.archive = archive
+        self.ttl = ttl
+        self.miss_refresh_interval = miss_refresh_interval
+        self._indexes = {}
+        self._locks = {}
+        self._warming = {}
+
+    async def _index(self, subdomain: str = None, max_age: float = None) -> _SubdomainIndex:
+        max_age = self.ttl if max_age is None else max_age
+        index = self._indexes.get(subdomain)
+        if index is not None and index.age() < max_age:
+            return index
+
+        # Only one coroutine per subdomain downloads the tournament list, the others wait for its result.
+        lock = self._locks.setdefault(subdomain, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(subdomain)
+            if index is None or index.age() >= max_age:
+                lists = await asyncio.gather(*(
+                    self.client.tournaments.index(state=state, subdomain=subdomain) for state in ACTIVE_FILTERS
+                ))
+                index = _SubdomainIndex([tournament for tournaments in lists for tournament in tournaments])
+                self._indexes[subdomain] = index
+        return index
+
+    async def get(self, name: str, subdomain: str = None, state: str = "all"):
+        """
+        Finds a tournament by its case-insensitive name.
+
+        :param name: The tournament name.
+        :param subdomain: The Challonge community (subdomain) hosting the tournament, None for the account itself.
+        :param state: A Challonge state filter ('all', 'pending', 'in progress', 'ended').
+        :return: The tournament model, or None if no tournament with that name is in the requested state.
+        """
+        index = await self._index(subdomain)
+        tournament = _match_state(index.by_name.get(name.lower(), []), state)
+        if tournament is None and state in ("all", "ended"):
+            tournament = _match_state(await self._archived(subdomain, name), state)
+        if tournament is None and state != "ended" and index.age() >= self.miss_refresh_interval:
+            # The tournament may have been created outside the bot, refresh once before giving up.
+            index = await self._index(subdomain, max_age=self.miss_refresh_interval)
+            tournament = _match_state(index.by_name.get(name.lower(), []), state)
+        return tournament
+
+    async def list(self, subdomain: str = None, state: str = "all") -> list:
+        """
+        Lists the tournaments of a subdomain.
+
+        :param subdomain: The Challonge community (subdomain), None for the account itself.
+        :param state: A Challonge state filter ('all', 'pending', 'in progress', 'ended').
+        :return: The tournament models in the requested state, in the order Challonge returned them, followed by the
+            archived ones for 'all' and 'ended'.
+        """
+        if state == "ended":
+            return await self._archived(subdomain)
+        index = await self._index(subdomain)
+        states = STATE_FILTERS[state]
+        if states is None:
+            return index.tournaments + await self._archived(subdomain)
+        return [t for s in states for t in index.by_state.get(s, [])]
+
+    def peek(self, name: str, subdomain: str = None, state: str = "all"):
+        """
+        Finds a pending or in progress tournament by its case-insensitive name in the cached index only, even if the
+        index is stale. Never waits on Challonge, which makes it usable from autocomplete handlers.
+
+        :param name: The tournament name.
+        :param subdomain: The Challonge community (subdomain), None for the account itself.
+        :param state: A Challonge state filter ('all', 'pending', 'in progress').
+        :return: The tournament model, or None if it is not in the cached index.
+        """
+        index = self._cached(subdomain)
+        if index is None:
+            return None
+        return _match_state(index.by_name.get(name.lower(), []), state)
+
+    def complete(self, prefix: str, subdomain: str = None, state: str = "all", accept=None,
+                 limit: int = MAX_CHOICES) -> list:
+        """
+        Completes a pending or in progress tournament name from the cached index. Like :meth:`peek` it never waits
+        on Challonge.
+
+        :param prefix: What the user typed so far.
+        :param subdomain: The Challonge community (subdomain), None for the account itself.
+        :param state: A Challonge state filter ('all', 'pending', 'in progress').
+        :param accept: Optional predicate on the tournament model, e.g. to only offer Quickfire tournaments.
+        :param limit: The maximum number of names returned.
+        :return: The matching tournament names.
+        """
+        index = self._cached(subdomain)
+        if index is None:
+            return []
+
+        def matches(name):
+            tournament = _match_state(index.by_name[name.lower()], state)
+            return tournament is not None and (accept is None or accept(tournament))
+
+        return index.names.complete(prefix, limit=limit, accept=matches)
+
+    def load(self, subdomain: str, tournaments: list):
+        """
+        Replaces the cached index of a subdomain with a tournament list fetched elsewhere (e.g. by the mirror).
+
+        :param subdomain: The Challonge community (subdomain), None for the account itself.
+        :param tournaments: The pending and in progress tournaments of the subdomain, as returned by the tournament
+            index.
+        """
+        self._indexes[subdomain] = _SubdomainIndex(tournaments)
+
+    def invalidate(self, subdomain: str = None):
+        """
+        Marks the cached index of a subdomain as stale so the next lookup refetches it from Challonge. Autocomplete
+        keeps using the stale index until then.
+
+        :param subdomain: The Challonge community (subdomain), None for the account itself.
+        """
+        index = self._indexes.get(subdomain)
+        if index is not None:
+            index.loaded_at = float("-inf")
+
+    def _cached(self, subdomain: str = None):
+        index = self._indexes.get(subdomain)
+        if (index is None or index.age() >= self.ttl) and subdomain not in self._warming:
+            # Refresh in the background, the caller is served from what is cached right now.
+            task = asyncio.create_task(self._warm(subdomain))
+            self._warming[subdomain] = task
+            task.add_done_callback(lambda t: self._warmed(subdomain, t))
+        return index
+
+    async def _warm(self, subdomain: str = None):
+        set_priority(BACKGROUND)
+        await self._index(subdomain)
+
+    def _warmed(self, subdomain: str, task: asyncio.Task):
+        self._warming.pop(subdomain, None)
+        if not task.cancelled():
+            # A failed refresh is retried on the next lookup.
+            task.exception()
+
+    async def _archived(self, subdomain: str = None, name: str = None) -> list:
+        if self.archive is not None:
+            return await self.archive.archived(subdomain, name=name)
+        # Without an archive, ended tournaments are fetched from Challonge on every lookup.
+        tournaments = await self.client.tournaments.index(state="ended", subdomain=subdomain)
+        return [Tournament.from_api(t) for t in tournaments if name is None or t["name"].lower() == name.lower()]
+
+
+def _match_state(tournaments: list, state: str):
+    states = STATE_FILTERS[state]
+    return next((t for t in tournaments if states is None or t.state in states), None)
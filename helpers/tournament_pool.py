@@ -0,0 +1,102 @@
+import asyncio
+import itertools
+import time
+
+from exceptions import ChallongeError
+from helpers.rate_limiter import BACKGROUND, set_priority
+
+# Pending tournaments waiting in the pool carry this name, which keeps them out of every Quickfire listing and lookup.
+RESERVE_NAME = "QF Reserve"
+
+
+class TournamentPool:
+    """
+    A small pool of pre-created, pending Challonge tournaments, so a new Quickfire is ready the moment one fills.
+
+    Taking a tournament only renames it. A background task creates replacements so the pool stays at ``size``.
+    Reserve tournaments left over from a previous run are picked up again on start.
+    """
+
+    def __init__(self, client, catalog, logger, size: int = 1, game_name: str = "Hero Realms Digital",
+                 retry_interval: float = 60.0):
+        self.client = client
+        self.catalog = catalog
+        self.logger = logger
+        self.size = size
+        self.game_name = game_name
+        self.retry_interval = retry_interval
+        # IDs of the reserve tournaments
+        self._reserve = []
+        self._refill = asyncio.Event()
+        self._task = None
+        self._counter = itertools.count()
+
+    def start(self):
+        """
+        Starts keeping the pool filled in the background.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._keep_filled())
+
+    async def close(self):
+        """
+        Stops refilling the pool. Reserve tournaments are kept on Challonge for the next run.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def take(self, name: str) -> dict:
+        """
+        Takes a tournament from the pool and gives it its final name.
+
+        Falls back to creating the tournament on the spot if the pool is empty or the reserve cannot be renamed.
+
+        :param name: The name of the new tournament, e.g. "Quickfire 13".
+        :return: The tournament.
+        """
+        self._refill.set()
+        tournament = None
+        if self._reserve:
+            reserve_id = self._reserve.pop(0)
+            try:
+                tournament = await self.client.tournaments.update(reserve_id, name=name)
+            except ChallongeError as e:
+                # A reserve that Challonge rejects (e.g. deleted) is dropped, one it could not be asked about is kept.
+                if e.status is None:
+                    self._reserve.insert(0, reserve_id)
+                self.logger.warning(f"Failed to take reserve Quickfire tournament {reserve_id}, creating one: {e}")
+        if tournament is None:
+            tournament = await self._create(name)
+        self.catalog.invalidate()
+        return tournament
+
+    async def _create(self, name: str) -> dict:
+        # Challonge URLs are unique per account, so add the time and a counter.
+        url = f"quickfire{int(time.time())}{next(self._counter)}"
+        return await self.client.tournaments.create(name, url=url, game_name=self.game_name)
+
+    async def _keep_filled(self):
+        # Filling the pool is never urgent, its Challonge calls wait behind player commands.
+        set_priority(BACKGROUND)
+
+        # Adopt reserve tournaments created by an earlier run first.
+        try:
+            self._reserve = [t.id for t in await self.catalog.list(state="pending") if t.name == RESERVE_NAME]
+        except Exception as e:
+            self.logger.warning(f"Failed to look up reserve Quickfire tournaments: {e}")
+
+        while True:
+            self._refill.clear()
+            try:
+                while len(self._reserve) < self.size:
+                    self._reserve.append((await self._create(RESERVE_NAME))['id'])
+            except Exception as e:
+                self.logger.warning(f"Failed to create a reserve Quickfire tournament: {e}")
+                await asyncio.sleep(self.retry_interval)
+                continue
+            await self._refill.wait()
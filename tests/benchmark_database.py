@@ -0,0 +1,93 @@
+"""
+Queries per second of the waitlist queries, opening a connection per query (as db_manager used to) and through the
+shared Database.
+
+Run from the repository root with ``python -m tests.benchmark_database``.
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+import aiosqlite
+
+from helpers.database import Database
+
+ROOT = f"{os.path.realpath(os.path.dirname(__file__))}/.."
+
+# Concurrent callers, like commands from several players at once, and the queries each one runs.
+WORKERS = 8
+QUERIES = 250
+PLAYERS = 500
+
+
+async def create_database(path: str, wal: bool):
+    database = Database(path)
+    await database.open()
+    with open(f"{ROOT}/database/schema.sql") as file:
+        await database.executescript(file.read())
+    await database.migrate(f"{ROOT}/database/migrations")
+    await database.execute("DELETE FROM waitlist")
+    for user_id in range(PLAYERS):
+        await database.execute("INSERT INTO waitlist(user_id, hr_ign) VALUES (?, ?)",
+                               (str(user_id), f"Player{user_id}"))
+    await database.close()
+    if not wal:
+        # The per-query connections of the old db_manager never enabled WAL.
+        async with aiosqlite.connect(path) as db:
+            await db.execute("PRAGMA journal_mode=DELETE")
+
+
+async def per_query_read(path: str, user_id: int):
+    async with aiosqlite.connect(path) as db:
+        async with db.execute("SELECT 1 FROM waitlist WHERE user_id=?", (str(user_id),)) as cursor:
+            return await cursor.fetchone()
+
+
+async def per_query_write(path: str, user_id: int):
+    async with aiosqlite.connect(path) as db:
+        await db.execute("UPDATE waitlist SET hr_ign=? WHERE user_id=?", (f"Player{user_id}", str(user_id)))
+        await db.commit()
+
+
+async def measure(query, total: int) -> float:
+    async def worker(offset: int):
+        for i in range(QUERIES):
+            await query((offset * QUERIES + i) % PLAYERS)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(WORKERS)))
+    return total / (time.perf_counter() - started)
+
+
+async def main():
+    total = WORKERS * QUERIES
+    with tempfile.TemporaryDirectory() as directory:
+        before_path = os.path.join(directory, "before.db")
+        after_path = os.path.join(directory, "after.db")
+        await create_database(before_path, wal=False)
+        await create_database(after_path, wal=True)
+
+        before_read = await measure(lambda user_id: per_query_read(before_path, user_id), total)
+        before_write = await measure(lambda user_id: per_query_write(before_path, user_id), total)
+
+        database = Database(after_path)
+        await database.open()
+        try:
+            after_read = await measure(
+                lambda user_id: database.fetchone("SELECT 1 FROM waitlist WHERE user_id=?", (str(user_id),)), total
+            )
+            after_write = await measure(
+                lambda user_id: database.execute("UPDATE waitlist SET hr_ign=? WHERE user_id=?",
+                                                 (f"Player{user_id}", str(user_id))), total
+            )
+        finally:
+            await database.close()
+
+    print(f"{total} queries from {WORKERS} concurrent callers")
+    print(f"reads:  {before_read:8.0f} q/s per-query connection, {after_read:8.0f} q/s shared database")
+    print(f"writes: {before_write:8.0f} q/s per-query connection, {after_write:8.0f} q/s shared database")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+import asyncio
+import unittest
+
+from helpers.admission import ADMITTED, DUPLICATE, FULL, AdmissionController
+from helpers.models import Participant
+
+
+class _Mirror:
+    def __init__(self, names: list = ()):
+        self.names = list(names)
+        self.calls = 0
+
+    async def participants(self, tournament_id: int) -> list:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return [Participant(id=i, name=name) for i, name in enumerate(self.names)]
+
+
+def _create(name: str, fail: bool = False):
+    async def create():
+        # Stands in for the Challonge request, long enough for every signup to overlap.
+        await asyncio.sleep(0.05)
+        if fail:
+            raise RuntimeError("Challonge is down")
+        return {"name": name}
+
+    return create
+
+
+class AdmissionControllerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_fifty_concurrent_signups(self):
+        mirror = _Mirror()
+        admission = AdmissionController(mirror, capacity=16)
+        # 40 different players, the last 10 signups repeat the first 10 names in another case.
+        names = [f"Player{i}" if i < 40 else f"PLAYER{i - 40}" for i in range(50)]
+
+        results = await asyncio.gather(*(admission.admit(1, name, _create(name)) for name in names))
+
+        outcomes = [outcome for outcome, _, _ in results]
+        admitted = [participant["name"] for outcome, participant, _ in results if outcome == ADMITTED]
+        self.assertEqual(len(admitted), 16)
+        self.assertEqual(len({name.lower() for name in admitted}), 16)
+        self.assertEqual(outcomes[40:], [DUPLICATE] * 10)
+        self.assertEqual(outcomes.count(FULL), 24)
+        self.assertEqual(sum(fills for _, _, fills in results), 1)
+        # The roster was loaded from the mirror once for all 50 signups.
+        self.assertEqual(mirror.calls, 1)
+
+    async def test_failed_create_gives_its_seat_back(self):
+        admission = AdmissionController(_Mirror(), capacity=16)
+        names = [f"Player{i}" for i in range(17)]
+        signups = [admission.admit(1, name, _create(name, fail=name == "Player0")) for name in names]
+
+        results = await asyncio.gather(*signups, return_exceptions=True)
+
+        self.assertIsInstance(results[0], RuntimeError)
+        self.assertEqual([outcome for outcome, _, _ in results[1:16]], [ADMITTED] * 15)
+        # The failed signup still held its seat when the 17th player arrived.
+        self.assertEqual(results[16][0], FULL)
+        self.assertFalse(any(fills for _, _, fills in results[1:]))
+
+        # Its seat is free again, the next signup gets it and fills the tournament.
+        outcome, _, fills = await admission.admit(1, "Player0", _create("Player0"))
+        self.assertEqual(outcome, ADMITTED)
+        self.assertTrue(fills)
+        outcome, _, fills = await admission.admit(1, "Late", _create("Late"))
+        self.assertEqual((outcome, fills), (FULL, False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+
+from helpers.bracket_cache import BracketCache
+
+
+class BracketCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = BracketCache(directory=self.directory.name)
+
+    async def asyncTearDown(self):
+        self.directory.cleanup()
+
+    async def test_disk_keeps_only_the_latest_image(self):
+        await self.cache.put(1, "v1", b"first")
+        await self.cache.put(1, "v2", b"second", aliases=("v1",))
+        self.assertEqual(len(os.listdir(self.directory.name)), 1)
+        self.assertEqual(await self.cache.get(1, "v1"), b"second")
+
+        # A new process finds the image on disk under the version that was drawn.
+        restarted = BracketCache(directory=self.directory.name)
+        self.assertEqual(await restarted.get(1, "v2"), b"second")
+        self.assertIsNone(await restarted.get(1, "v1"))
+
+    async def test_invalidate_removes_images_from_disk(self):
+        await self.cache.put(1, "v1", b"first")
+        await self.cache.put(2, "v1", b"other")
+        generation = self.cache.generation(1)
+        await self.cache.invalidate(1)
+
+        self.assertEqual(len(os.listdir(self.directory.name)), 1)
+        self.assertIsNone(await self.cache.get(1, "v1"))
+        self.assertEqual(await self.cache.get(2, "v1"), b"other")
+
+        # A render started before the invalidation is not cached.
+        await self.cache.put(1, "v1", b"stale", generation=generation)
+        self.assertIsNone(await self.cache.get(1, "v1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
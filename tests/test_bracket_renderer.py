@@ -0,0 +1,124 @@
+import asyncio
+import dataclasses
+import logging
+import unittest
+
+from helpers.bracket_cache import BracketCache
+from helpers.bracket_renderer import BracketRenderer, BracketRenderQueue
+from helpers.models import Tournament
+from helpers.rate_limiter import RateLimiter
+
+TOURNAMENT = Tournament(id=1, name="Quickfire 1", state="underway", tournament_type="single elimination",
+                        participants_count=2, updated_at="2024-01-01T00:00:00.000Z")
+
+DETAILS = {
+    "updated_at": "2024-01-01T00:00:05.000Z",
+    "tournament_type": "single elimination",
+    "participants": [{"id": 10, "name": "Alice"}, {"id": 11, "name": "Bob"}],
+    "matches": [{"id": 100, "round": 1, "state": "complete", "player1_id": 10, "player2_id": 11,
+                 "winner_id": 10, "loser_id": 11, "scores_csv": "2-1"}],
+}
+
+
+class _Tournaments:
+    def __init__(self, rate_limiter: RateLimiter):
+        self.rate_limiter = rate_limiter
+        self.calls = 0
+        self.failures = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def show(self, tournament_id: int, **params) -> dict:
+        # Every Challonge call takes a token, like ChallongeClient._request.
+        await self.rate_limiter.acquire()
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("Challonge is down")
+        return DETAILS
+
+
+class _Challonge:
+    def __init__(self, rate_limiter: RateLimiter):
+        self.tournaments = _Tournaments(rate_limiter)
+
+
+class BracketRenderQueueTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.rate_limiter = RateLimiter()
+        self.challonge = _Challonge(self.rate_limiter)
+        self.cache = BracketCache()
+        self.renderer = BracketRenderer(self.challonge, None, self.cache, max_workers=1)
+        self.queue = BracketRenderQueue(self.renderer, logging.getLogger(__name__), delay=0.01)
+
+    async def asyncTearDown(self):
+        self.queue.close()
+        self.renderer.close()
+
+    async def test_background_render_goes_through_rate_limiter(self):
+        self.queue.schedule(TOURNAMENT)
+        await asyncio.wait_for(asyncio.gather(*self.queue._tasks.values()), timeout=30)
+
+        metrics = self.rate_limiter.metrics()
+        self.assertEqual(metrics["background"]["acquired"], 1)
+        self.assertEqual(metrics["interactive"]["acquired"], 0)
+        self.assertEqual(self.rate_limiter._waiters, [])
+
+        # The limiter still serves later calls.
+        await asyncio.wait_for(self.rate_limiter.acquire(), timeout=5)
+
+    async def test_scheduled_render_populates_cache(self):
+        self.queue.schedule(TOURNAMENT)
+        self.queue.schedule(TOURNAMENT)
+        await asyncio.wait_for(asyncio.gather(*self.queue._tasks.values()), timeout=30)
+
+        # The image is stored under the version that was drawn.
+        image = await self.cache.get(TOURNAMENT.id, DETAILS["updated_at"])
+        self.assertTrue(image.startswith(b"\x89PNG"))
+        # Both reports were collapsed into one render.
+        self.assertEqual(self.challonge.tournaments.calls, 1)
+
+    async def test_bracket_after_report_is_served_from_pre_render(self):
+        # A report invalidates the bracket and schedules a pre-render of the catalog's tournament, whose updated_at
+        # is still the one from before the report.
+        await self.cache.invalidate(TOURNAMENT.id)
+        self.queue.schedule(TOURNAMENT)
+        await asyncio.wait_for(asyncio.gather(*self.queue._tasks.values()), timeout=30)
+
+        # The mirror's next poll loads Challonge's new updated_at into the catalog.
+        refreshed = dataclasses.replace(TOURNAMENT, updated_at=DETAILS["updated_at"])
+        for tournament in (TOURNAMENT, refreshed):
+            image = await self.renderer.render(tournament)
+            self.assertTrue(image.startswith(b"\x89PNG"))
+        self.assertEqual(self.challonge.tournaments.calls, 1)
+
+        # A change made outside the bot is not served from the old image.
+        changed = dataclasses.replace(TOURNAMENT, updated_at="2024-01-01T00:01:00.000Z")
+        await self.renderer.render(changed)
+        self.assertEqual(self.challonge.tournaments.calls, 2)
+
+    async def test_request_joining_failed_pre_render_retries_interactively(self):
+        tournaments = self.challonge.tournaments
+        tournaments.failures = 1
+        tournaments.release.clear()
+        self.queue.schedule(TOURNAMENT)
+        await asyncio.wait_for(tournaments.started.wait(), timeout=5)
+
+        # A player asks for the bracket while the pre-render is running, then the pre-render fails.
+        request = asyncio.create_task(self.renderer.render(TOURNAMENT))
+        await asyncio.sleep(0)
+        tournaments.release.set()
+        image = await asyncio.wait_for(request, timeout=30)
+
+        self.assertTrue(image.startswith(b"\x89PNG"))
+        self.assertEqual(tournaments.calls, 2)
+        metrics = self.rate_limiter.metrics()
+        self.assertEqual(metrics["background"]["acquired"], 1)
+        self.assertEqual(metrics["interactive"]["acquired"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import aiohttp
+
+from exceptions import ChallongeError
+from helpers import challonge_client
+from helpers.challonge_client import ChallongeClient
+
+
+class ChallongeClientTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = ChallongeClient("user", "key", timeout=5)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_connection_error_is_wrapped(self):
+        # Nothing listens on port 1, so the connection is refused.
+        with mock.patch.object(challonge_client, "CHALLONGE_API_URL", "http://127.0.0.1:1"):
+            with self.assertRaises(ChallongeError) as raised:
+                await self.client.tournaments.index()
+        self.assertIsInstance(raised.exception.__cause__, aiohttp.ClientError)
+
+    async def test_timeout_is_wrapped(self):
+        with mock.patch.object(aiohttp.ClientSession, "request", side_effect=asyncio.TimeoutError):
+            with self.assertRaises(ChallongeError) as raised:
+                await self.client.tournaments.index()
+        self.assertIn("TimeoutError", str(raised.exception))
+        self.assertIsInstance(raised.exception.__cause__, asyncio.TimeoutError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+import asyncio
+import unittest
+
+from helpers.rate_limiter import BACKGROUND, RateLimiter, set_priority
+
+
+class RateLimiterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_unknown_lane_is_rejected(self):
+        limiter = RateLimiter(burst=1)
+        with self.assertRaises(ValueError):
+            set_priority((47, 49, 54))
+        with self.assertRaises(ValueError):
+            await limiter.acquire(7)
+        self.assertEqual(limiter._waiters, [])
+
+        # The bucket is still usable afterwards.
+        await asyncio.wait_for(limiter.acquire(), timeout=5)
+        await asyncio.wait_for(limiter.acquire(BACKGROUND), timeout=5)
+        self.assertEqual(limiter.metrics()["background"]["acquired"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
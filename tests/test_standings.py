@@ -0,0 +1,58 @@
+import copy
+import unittest
+
+from helpers.standings import DivisionStandings, StandingsStore
+
+TOURNAMENT = {
+    "id": 1,
+    "participants": [{"id": 10, "name": "Alice"}, {"id": 11, "name": "Bob"}, {"id": 12, "name": "Carol"}],
+    "matches": [
+        {"id": 100, "player1_id": 10, "player2_id": 11, "scores_csv": "2-1"},
+        {"id": 101, "player1_id": 10, "player2_id": 12, "scores_csv": ""},
+        {"id": 102, "player1_id": 11, "player2_id": 12, "scores_csv": ""},
+    ],
+}
+
+
+class StandingsStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = StandingsStore()
+        self.division = DivisionStandings.from_tournament(TOURNAMENT)
+        self.store.put(self.division)
+
+    def test_own_report_is_not_applied_twice(self):
+        # The report command records its result, then the mirror poll refetches the division.
+        self.division.record(101, 10, 12, "2-0")
+        tournament = copy.deepcopy(TOURNAMENT)
+        tournament["matches"][1]["scores_csv"] = "2-0"
+        before = copy.deepcopy(self.division.stats)
+
+        self.store.reconcile(tournament)
+        self.assertIs(self.store.get(1), self.division)
+        self.assertEqual(self.division.stats, before)
+
+    def test_changes_made_on_challonge_are_applied(self):
+        tournament = copy.deepcopy(TOURNAMENT)
+        tournament["matches"][0]["scores_csv"] = "0-2"
+        tournament["matches"][2]["scores_csv"] = "2-1"
+        self.store.reconcile(tournament)
+
+        expected = DivisionStandings.from_tournament(tournament)
+        self.assertIs(self.store.get(1), self.division)
+        self.assertEqual(self.division.stats, expected.stats)
+        self.assertEqual(self.division.table(), expected.table())
+
+        # A result cleared on Challonge is taken back.
+        tournament["matches"][2]["scores_csv"] = ""
+        self.store.reconcile(tournament)
+        self.assertEqual(self.division.stats, DivisionStandings.from_tournament(tournament).stats)
+
+    def test_roster_change_drops_standings(self):
+        tournament = copy.deepcopy(TOURNAMENT)
+        tournament["participants"].append({"id": 13, "name": "Dave"})
+        self.store.reconcile(tournament)
+        self.assertIsNone(self.store.get(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
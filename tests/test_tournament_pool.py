@@ -0,0 +1,61 @@
+import logging
+import unittest
+
+from exceptions import ChallongeError
+from helpers.tournament_pool import TournamentPool
+
+
+class _Tournaments:
+    def __init__(self, update_error: ChallongeError = None):
+        self.update_error = update_error
+        self.created = []
+
+    async def update(self, tournament_id: int, **params) -> dict:
+        if self.update_error is not None:
+            raise self.update_error
+        return {"id": tournament_id, **params}
+
+    async def create(self, name: str, url: str, **params) -> dict:
+        self.created.append(name)
+        return {"id": 100 + len(self.created), "name": name}
+
+
+class _Client:
+    def __init__(self, update_error: ChallongeError = None):
+        self.tournaments = _Tournaments(update_error)
+
+
+class _Catalog:
+    def invalidate(self, subdomain: str = None):
+        pass
+
+
+class TournamentPoolTest(unittest.IsolatedAsyncioTestCase):
+    def _pool(self, client: _Client) -> TournamentPool:
+        pool = TournamentPool(client, _Catalog(), logging.getLogger(__name__))
+        pool._reserve = [1]
+        return pool
+
+    async def test_take_renames_reserve(self):
+        client = _Client()
+        pool = self._pool(client)
+        self.assertEqual(await pool.take("Quickfire 13"), {"id": 1, "name": "Quickfire 13"})
+        self.assertEqual(client.tournaments.created, [])
+
+    async def test_deleted_reserve_falls_back_to_create(self):
+        client = _Client(ChallongeError("Not found.", status=404))
+        pool = self._pool(client)
+        tournament = await pool.take("Quickfire 13")
+        self.assertEqual(tournament["name"], "Quickfire 13")
+        self.assertEqual(client.tournaments.created, ["Quickfire 13"])
+        self.assertEqual(pool._reserve, [])
+
+    async def test_unreachable_challonge_keeps_reserve(self):
+        client = _Client(ChallongeError("Could not reach Challonge."))
+        pool = self._pool(client)
+        await pool.take("Quickfire 13")
+        self.assertEqual(pool._reserve, [1])
+
+
+if __name__ == "__main__":
+    unittest.main()